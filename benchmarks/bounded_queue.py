@@ -0,0 +1,56 @@
+import asyncio
+from otpclient.client.enums import OverflowPolicyEnum
+from otpclient.client.stream_handler.bounded_queue import BoundedStreamQueue
+from otpclient.proto.quote import Quote
+from otpclient.proto.quote_pb2 import Quote as QuoteProto
+
+# GOAL: Show the peak number of queued quotes and the age of the quotes a slow consumer works on during a burst,
+# with the unbounded asyncio.Queue subscribe_queue is usually given and with each BoundedStreamQueue policy
+
+SYMBOLS = 200
+BURST = 200_000
+MAXSIZE = 1_000
+
+
+def burst_quotes() -> list[Quote]:
+    return [Quote(QuoteProto(Symbol=f"S{i % SYMBOLS}", BidPrice=100.0, AskPrice=100.5, Timestamp=i,
+                             Fingerprint=str(i)))
+            for i in range(BURST)]
+
+
+async def consume(queue: asyncio.Queue, produced: list[int], ages: list[int]) -> None:
+    """Slow consumer handling one quote per event loop iteration, the producer puts 100, recording how many quotes
+    were produced after each quote it receives."""
+    while (quote := await queue.get()) is not None:
+        ages.append(produced[0] - quote.timestamp)
+        await asyncio.sleep(0)
+
+
+async def run(queue: asyncio.Queue, quotes: list[Quote]) -> tuple[int, float, int]:
+    produced = [0]
+    ages: list[int] = []
+    peak = 0
+    consumer = asyncio.create_task(consume(queue, produced, ages))
+    for quote in quotes:
+        await queue.put(quote)
+        produced[0] = quote.timestamp
+        peak = max(peak, queue.qsize())
+        # NATS hands messages over from its reader task, the consumer runs in between
+        if quote.timestamp % 100 == 0:
+            await asyncio.sleep(0)
+    await queue.put(None)
+    await consumer
+    return peak, sum(ages) / len(ages), len(ages)
+
+
+async def main():
+    quotes = burst_quotes()
+    queues = {"unbounded asyncio.Queue": asyncio.Queue()}
+    queues.update({policy.value: BoundedStreamQueue(MAXSIZE, policy) for policy in OverflowPolicyEnum})
+    for name, queue in queues.items():
+        peak, age, consumed = await run(queue, quotes)
+        print(f"{name:>24}: peak {peak:8,} queued, consumed {consumed:8,}, mean age {age:10,.0f} quotes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
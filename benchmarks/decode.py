@@ -0,0 +1,86 @@
+import time
+
+from otpclient.client.decoding import decode_columns, decode_messages
+from otpclient.client.enums import DatatypeEnum
+from otpclient.client.stream_handler.entity_mapping import loadable_map
+from otpclient.proto.bar_pb2 import Bar as BarProto
+from otpclient.proto.columnar import supports_columns
+from otpclient.proto.LULD_pb2 import LULD as LULDProto
+from otpclient.proto.news_pb2 import News as NewsProto
+from otpclient.proto.news_pb2 import NewsSentiment as NewsSentimentProto
+from otpclient.proto.orderbook_pb2 import Orderbook as OrderbookProto
+from otpclient.proto.orderbook_pb2 import OrderbookEntry as OrderbookEntryProto
+from otpclient.proto.quote_pb2 import Quote as QuoteProto
+from otpclient.proto.trade_pb2 import Trade as TradeProto
+from otpclient.proto.tradingstatus_pb2 import TradingStatus as TradingStatusProto
+from otpclient.proto.transmission_message import TransmissionMessage
+from otpclient.proto.transmission_message_pb2 import Message
+
+# GOAL: Measure the messages per second decoded per entity type by the single decode loop (decode_messages) and the
+# columnar decoder, compared to decoding each message on its own through the DatatypeEnum lookup
+
+COUNT = 100_000
+
+
+def sample_protos():
+    return {
+        DatatypeEnum.BAR: BarProto(Symbol="AAPL", Exchange="V", Open=1.0, High=2.0, Low=0.5, Close=1.5, Volume=100.0,
+                                   VWAP=1.2, Timestamp=1_700_000_000, TradeCount=10, Fingerprint="f",
+                                   Source="alpaca", AssetClass="stock", Timeframe="1min"),
+        DatatypeEnum.QUOTES: QuoteProto(Symbol="AAPL", BidExchange="V", Exchange="V", BidPrice=1.0, BidSize=2.0,
+                                        AskExchange="V", AskPrice=1.1, AskSize=3.0, Timestamp=1_700_000_000,
+                                        Conditions=["R"], Tape="C", Fingerprint="f", Source="alpaca",
+                                        AssetClass="stock"),
+        DatatypeEnum.TRADES: TradeProto(ID=1, Symbol="AAPL", Exchange="V", Price=1.0, Size=2.0,
+                                        Timestamp=1_700_000_000, TakerSide="B", Conditions=["@", "I"], Tape="C",
+                                        Fingerprint="f", Source="alpaca", AssetClass="stock"),
+        DatatypeEnum.LULD: LULDProto(Symbol="AAPL", LimitUpPrice=2.0, LimitDownPrice=1.0, Indicator="B",
+                                     Timestamp=1_700_000_000, Tape="C", Fingerprint="f", Source="alpaca",
+                                     AssetClass="stock"),
+        DatatypeEnum.STATUS: TradingStatusProto(Symbol="AAPL", StatusCode="H", StatusMsg="Halted", ReasonCode="T1",
+                                                ReasonMsg="News pending", Timestamp=1_700_000_000, Tape="C",
+                                                Fingerprint="f", Source="alpaca", AssetClass="stock"),
+        DatatypeEnum.ORDERBOOK: OrderbookProto(Symbol="BTC/USD", Exchange="CBSE", Timestamp=1_700_000_000,
+                                               Asks=[OrderbookEntryProto(Price=100.0 + i, Size=1.0) for i in range(5)],
+                                               Bids=[OrderbookEntryProto(Price=99.0 - i, Size=1.0) for i in range(5)],
+                                               Fingerprint="f", Source="alpaca", AssetClass="crypto"),
+        DatatypeEnum.NEWS_WITH_SENTIMENT: NewsProto(id=1, Author="a", CreatedAt=1_700_000_000, Headline="Headline",
+                                                    Summary="Summary", Symbols=["AAPL"], Fingerprint="f",
+                                                    Source="alpaca",
+                                                    Sentiments=[NewsSentimentProto(Sentiment="positive",
+                                                                                   Symbol="AAPL")]),
+    }
+
+
+def decode_each(protos: list[bytes]) -> list:
+    """The previous decode path: each message is decoded on its own, looking its entity class up through
+    DatatypeEnum."""
+    result = []
+    for data in protos:
+        msg = TransmissionMessage.load(data)
+        result.append(loadable_map[DatatypeEnum(msg.data_type)].load(msg.payload))
+    return result
+
+
+def messages_per_second(decode, protos: list[bytes]) -> float:
+    start = time.perf_counter()
+    decode(protos)
+    return len(protos) / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'type':>20} {'per message':>12} {'decode loop':>12} {'columns':>12}  (messages/s)")
+    for data_type, proto in sample_protos().items():
+        message = Message(Topic="topic", DataType=data_type.value, Payload=proto.SerializeToString())
+        protos = [message.SerializeToString()] * COUNT
+        each = messages_per_second(decode_each, protos)
+        loop = messages_per_second(decode_messages, protos)
+        if supports_columns(loadable_map[data_type]):
+            columns = f"{messages_per_second(decode_columns, protos):12,.0f}"
+        else:
+            columns = f"{'-':>12}"
+        print(f"{data_type.value:>20} {each:12,.0f} {loop:12,.0f} {columns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import tracemalloc
+
+from otpclient.proto.bar import Bar
+from otpclient.proto.bar_pb2 import Bar as BarProto
+from otpclient.proto.quote import Quote
+from otpclient.proto.quote_pb2 import Quote as QuoteProto
+from otpclient.proto.trade import Trade
+from otpclient.proto.trade_pb2 import Trade as TradeProto
+
+# GOAL: Measure the memory used per entity by the __slots__ entity classes, compared to the previous entity classes
+# that stored their fields in an instance __dict__
+
+COUNT = 100_000
+
+
+class DictEntity:
+    """Stand-in for the previous entity classes: same fields, stored in an instance __dict__."""
+
+    def __init__(self, entity) -> None:
+        for name in entity.columns:
+            setattr(self, name, getattr(entity, name))
+
+
+def sample_protos():
+    bar = BarProto(Symbol="AAPL", Exchange="V", Open=1.0, High=2.0, Low=0.5, Close=1.5, Volume=100.0, VWAP=1.2,
+                   Timestamp=1_700_000_000, TradeCount=10, Fingerprint="f", Source="alpaca", AssetClass="stock",
+                   Timeframe="1min")
+    quote = QuoteProto(Symbol="AAPL", BidExchange="V", Exchange="V", BidPrice=1.0, BidSize=2.0, AskExchange="V",
+                       AskPrice=1.1, AskSize=3.0, Timestamp=1_700_000_000, Conditions=["R"], Tape="C",
+                       Fingerprint="f", Source="alpaca", AssetClass="stock")
+    trade = TradeProto(ID=1, Symbol="AAPL", Exchange="V", Price=1.0, Size=2.0, Timestamp=1_700_000_000,
+                       TakerSide="B", Conditions=["@"], Tape="C", Fingerprint="f", Update="", Source="alpaca",
+                       AssetClass="stock")
+    return [(Bar, bar), (Quote, quote), (Trade, trade)]
+
+
+def bytes_per_entity(build) -> float:
+    """Returns the memory allocated per entity by build, a function returning COUNT entities."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    entities = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(entities) == COUNT
+    return (after - before) / COUNT
+
+
+def main():
+    for entity_cls, proto in sample_protos():
+        # Fields are decoded from a fresh proto per entity, as it happens when decoding messages
+        payload = proto.SerializeToString()
+        slotted = bytes_per_entity(lambda: [entity_cls.load(payload) for _ in range(COUNT)])
+        with_dict = bytes_per_entity(lambda: [DictEntity(entity_cls.load(payload)) for _ in range(COUNT)])
+        print(f"{entity_cls.__name__:>6}: __dict__ {with_dict:7.1f} B/entity, __slots__ {slotted:7.1f} B/entity "
+              f"({with_dict / slotted:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import time
+
+import pandas as pd
+
+from otpclient.client.stream_handler.live_frame import LiveFrame
+from otpclient.proto.quote import Quote
+from otpclient.proto.quote_pb2 import Quote as QuoteProto
+
+# GOAL: Compare keeping a DataFrame up to date with pd.concat per incoming quote, as the examples used to do, with
+# appending to a LiveFrame and taking a view of it
+
+SEED = 50_000
+TICKS = 2_000
+
+
+def quotes(count: int, offset: int = 0) -> list[Quote]:
+    return [Quote(QuoteProto(Symbol="BTC/USD", Exchange="CBSE", BidPrice=100.0 + i, AskPrice=100.5 + i,
+                             BidSize=1.0, AskSize=1.0, Timestamp=1_700_000_000 + offset + i, Fingerprint=str(i),
+                             Source="alpaca", AssetClass="crypto"))
+            for i in range(count)]
+
+
+def main():
+    seed, ticks = quotes(SEED), quotes(TICKS, SEED)
+
+    start = time.perf_counter()
+    df = Quote.list_to_dataframe(seed)
+    for quote in ticks:
+        df = pd.concat([df, Quote.list_to_dataframe([quote])])
+    concat = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frame = LiveFrame(Quote)
+    frame.extend(seed)
+    for quote in ticks:
+        frame.append(quote)
+        frame.view()
+    live = time.perf_counter() - start
+
+    start = time.perf_counter()
+    window = LiveFrame(Quote, window=SEED)
+    window.extend(seed)
+    for quote in ticks:
+        window.append(quote)
+        window.view()
+    windowed = time.perf_counter() - start
+
+    assert len(df) == len(frame) == SEED + TICKS
+    print(f"pd.concat per tick:          {TICKS / concat:10,.0f} ticks/s")
+    print(f"LiveFrame append + view:     {TICKS / live:10,.0f} ticks/s ({concat / live:.1f}x)")
+    print(f"LiveFrame window + view:     {TICKS / windowed:10,.0f} ticks/s ({concat / windowed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
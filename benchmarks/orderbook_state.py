@@ -0,0 +1,78 @@
+import random
+import time
+
+from otpclient.client.stream_handler.orderbook_state import OrderbookState
+from otpclient.proto.orderbook import Orderbook
+from otpclient.proto.orderbook_pb2 import Orderbook as OrderbookProto
+from otpclient.proto.orderbook_pb2 import OrderbookEntry as OrderbookEntryProto
+
+# GOAL: Measure how many Orderbook stream updates per second OrderbookState applies, and how fast the book can be
+# queried while it is kept up to date
+
+SYMBOLS = ["BTC/USD", "ETH/USD", "SOL/USD"]
+SNAPSHOT_LEVELS = 500
+UPDATES = 200_000
+ENTRIES_PER_UPDATE = 4
+QUERIES = 200_000
+
+
+def entries(rng: random.Random, mid: float, side: int, count: int, removal_rate: float):
+    result = []
+    for _ in range(count):
+        price = round(mid + side * rng.randint(1, SNAPSHOT_LEVELS) * 0.5, 2)
+        size = 0.0 if rng.random() < removal_rate else round(rng.uniform(0.01, 5.0), 4)
+        result.append(OrderbookEntryProto(Price=price, Size=size))
+    return result
+
+
+def sample_updates(rng: random.Random) -> list[Orderbook]:
+    """Returns a snapshot per symbol followed by UPDATES incremental updates, a quarter of their entries removing a
+    level."""
+    updates = [Orderbook(OrderbookProto(Symbol=symbol, Timestamp=0, Reset=True,
+                                        Asks=entries(rng, 100.0, 1, SNAPSHOT_LEVELS, 0.0),
+                                        Bids=entries(rng, 100.0, -1, SNAPSHOT_LEVELS, 0.0)))
+               for symbol in SYMBOLS]
+    for i in range(UPDATES):
+        half = ENTRIES_PER_UPDATE // 2
+        updates.append(Orderbook(OrderbookProto(Symbol=SYMBOLS[i % len(SYMBOLS)], Timestamp=i + 1,
+                                                Asks=entries(rng, 100.0, 1, half, 0.25),
+                                                Bids=entries(rng, 100.0, -1, half, 0.25))))
+    return updates
+
+
+def main():
+    updates = sample_updates(random.Random(42))
+    state = OrderbookState()
+
+    start = time.perf_counter()
+    for update in updates:
+        state.apply(update)
+    elapsed = time.perf_counter() - start
+    print(f"apply:         {len(updates) / elapsed:12,.0f} updates/s "
+          f"({len(updates) * ENTRIES_PER_UPDATE / elapsed:12,.0f} levels/s)")
+
+    book = state.book(SYMBOLS[0])
+    print(f"book:          {book}")
+
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        book.best_bid()
+        book.best_ask()
+    elapsed = time.perf_counter() - start
+    print(f"best bid/ask:  {QUERIES / elapsed:12,.0f} queries/s")
+
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        book.asks.levels_through(100.0 + (i % SNAPSHOT_LEVELS) * 0.5)
+    elapsed = time.perf_counter() - start
+    print(f"depth count:   {QUERIES / elapsed:12,.0f} queries/s")
+
+    start = time.perf_counter()
+    for _ in range(QUERIES // 10):
+        book.bids.depth(10)
+    elapsed = time.perf_counter() - start
+    print(f"top 10 levels: {QUERIES // 10 / elapsed:12,.0f} queries/s")
+
+
+if __name__ == "__main__":
+    main()
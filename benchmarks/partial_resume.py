@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from otpclient.client.datastorage_client import DatastorageClient
+from otpclient.client.defaults import RESOLVE_MESSAGES_PER_SUBSCRIBER
+from otpclient.client.enums import AccountEnum, AssetClassEnum, DatatypeEnum, SourceEnum, TimeFrameEnum
+from otpclient.client.request.request import remove_json_preamble
+from otpclient.proto.bar_pb2 import Bar as BarProto
+from otpclient.proto.transmission_message_pb2 import Message
+
+# GOAL: Show that a data response larger than RESOLVE_MESSAGES_PER_SUBSCRIBER that times out part way through is
+# resumed by resolve_missing with a request for its tail only, and how much of the original transfer that is
+
+COUNT = 120_000
+# Share of the first response sent before the transfer stalls
+STALL_AFTER = 0.6
+TIMEOUT_SEC = 1
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class LoopbackMsg:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+
+class LoopbackSubscription:
+    def __init__(self, nc: "LoopbackNats", subject: str, cb: Callable[[Any], Awaitable[None]]) -> None:
+        self.nc = nc
+        self.subject = subject
+        self.delivered = 0
+        self._queue: asyncio.Queue[LoopbackMsg] = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(cb))
+
+    @property
+    def pending_msgs(self) -> int:
+        return self._queue.qsize()
+
+    async def _run(self, cb: Callable[[Any], Awaitable[None]]) -> None:
+        while True:
+            await cb(await self._queue.get())
+
+    def deliver(self, data: bytes) -> None:
+        self.delivered += 1
+        self._queue.put_nowait(LoopbackMsg(data))
+
+    async def unsubscribe(self) -> None:
+        self.nc.subs.remove(self)
+        self._task.cancel()
+
+
+class LoopbackNats:
+    """In-process stand-in for the NATS connection and the OTP data storage: a data get is answered with one bar per
+    minute of the requested range, sent round robin to the queue subscriptions of the response topic as NATS does.
+    The first response stalls after STALL_AFTER of its messages."""
+
+    def __init__(self) -> None:
+        self.subs: list[LoopbackSubscription] = []
+        self.responses: dict[str, list[bytes]] = {}
+        self.sent = 0
+        self._stalled = False
+
+    async def request(self, subject: str, data: bytes, timeout: float = 0) -> LoopbackMsg:
+        request = json.loads(remove_json_preamble(data.decode()))["request"]
+        first = request["startTime"] + (-request["startTime"]) % 60
+        messages = [Message(Payload=BarProto(Symbol="AAPL", Timestamp=ts, Close=float(ts), Fingerprint=str(ts))
+                            .SerializeToString(), DataType="bar").SerializeToString()
+                    for ts in range(first, request["endTime"] + 1, 60)]
+        topic = f"response.{len(self.responses)}.{len(messages)}"
+        self.responses[topic] = messages
+        return LoopbackMsg(json.dumps({"Err": "", "Message": "", "Status": "success",
+                                       "ResponseTopic": topic}).encode())
+
+    async def subscribe(self, subject: str, queue: str = "", cb: Any = None, **kwargs: Any) -> LoopbackSubscription:
+        sub = LoopbackSubscription(self, subject, cb)
+        self.subs.append(sub)
+        return sub
+
+    async def publish(self, subject: str, data: bytes) -> None:
+        messages = self.responses[subject]
+        if not self._stalled:
+            self._stalled = True
+            messages = messages[:int(len(messages) * STALL_AFTER)]
+        targets = [sub for sub in self.subs if sub.subject == subject]
+        for i, message in enumerate(messages):
+            targets[i % len(targets)].deliver(message)
+        self.sent += len(messages)
+
+
+async def main():
+    nc = LoopbackNats()
+    client = DatastorageClient(nc)  # type: ignore
+    end = START + timedelta(minutes=COUNT - 1)
+    print(f"{COUNT:,} messages, {RESOLVE_MESSAGES_PER_SUBSCRIBER:,} per subscriber when fanned out")
+
+    partial = await client.data_get_partial(SourceEnum.ALPACA, AssetClassEnum.STOCK, "AAPL", DatatypeEnum.BAR,
+                                            AccountEnum.DEFAULT, START, end, TimeFrameEnum.ONE_MINUTE, TIMEOUT_SEC)
+    missing = partial.missing_range
+    tail_only = missing is not None and missing[0] > partial.requested_range[0]
+    print(f"partial: {partial}, missing range {missing}, tail only: {tail_only}")
+
+    sent = nc.sent
+    t = time.perf_counter()
+    resumed = await client.resolve_missing(partial, TIMEOUT_SEC)
+    elapsed = time.perf_counter() - t
+    print(f"resumed: {resumed}, complete: {resumed.complete}, re-requested {nc.sent - sent:,} messages "
+          f"({(nc.sent - sent) / COUNT:.0%} of the original transfer) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
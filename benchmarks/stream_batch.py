@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from otpclient.client.enums import DatatypeEnum
+from otpclient.client.stream_handler.subscription_potential import SubscriptionPotential
+from otpclient.proto.trade_pb2 import Trade as TradeProto
+from otpclient.proto.transmission_message_pb2 import Message
+
+# GOAL: Measure the messages per second a single core pushes from the NATS callback of a stream subscription to a
+# consumer task through a queue, delivering one entity per message with subscribe and one batch per 1,000 messages
+# with subscribe_batch, as entities and as columns
+
+COUNT = 200_000
+MAX_BATCH = 1_000
+
+
+class Msg:
+    """Stand-in for nats.aio.msg.Msg, the callback only reads data."""
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+
+class CallbackCapture:
+    """Stand-in for the NATS client, keeps the callback of the subscription instead of subscribing."""
+
+    def __init__(self) -> None:
+        self.cb = None
+
+    async def subscribe(self, topic: str, cb):
+        self.cb = cb
+        return self
+
+    async def unsubscribe(self):
+        pass
+
+
+def sample_messages() -> list[Msg]:
+    messages = []
+    for i in range(COUNT):
+        trade = TradeProto(ID=i, Symbol="AAPL", Exchange="V", Price=100.0, Size=float(i % 1_000),
+                           Timestamp=1_700_000_000 + i, TakerSide="B", Conditions=["@", "I"], Tape="C",
+                           Fingerprint=f"AAPL-{i}", Source="alpaca", AssetClass="stock")
+        message = Message(Topic="alpaca.stock.trades.AAPL", DataType=DatatypeEnum.TRADES.value,
+                          Payload=trade.SerializeToString())
+        messages.append(Msg(message.SerializeToString()))
+    return messages
+
+
+async def consume(queue: asyncio.Queue, batched: bool) -> int:
+    """Consumer task counting the entities received until the None sentinel."""
+    received = 0
+    while (item := await queue.get()) is not None:
+        if not batched:
+            received += 1
+        else:
+            received += len(item) if isinstance(item, list) else len(item["id"])
+    return received
+
+
+async def messages_per_second(messages: list[Msg], batched: bool, **kwargs) -> float:
+    capture = CallbackCapture()
+    sub = SubscriptionPotential(capture, "alpaca.stock.trades.AAPL", DatatypeEnum.TRADES.value)
+    queue: asyncio.Queue = asyncio.Queue()
+    if batched:
+        await sub.subscribe_batch(queue.put, MAX_BATCH, max_latency_ms=60_000, **kwargs)
+    else:
+        await sub.subscribe(queue.put, **kwargs)
+    consumer = asyncio.create_task(consume(queue, batched))
+
+    start = time.perf_counter()
+    for i, msg in enumerate(messages):
+        await capture.cb(msg)
+        # NATS hands messages over from its reader task, the consumer runs in between
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    await sub.unsubscribe()
+    await queue.put(None)
+    received = await consumer
+    elapsed = time.perf_counter() - start
+    assert received == len(messages)
+    return len(messages) / elapsed
+
+
+async def main():
+    messages = sample_messages()
+    results = {
+        "per message": await messages_per_second(messages, batched=False),
+        "batches of entities": await messages_per_second(messages, batched=True),
+        "batches of columns": await messages_per_second(messages, batched=True, columnar=True),
+    }
+    for name, rate in results.items():
+        print(f"{name:>20}: {rate:12,.0f} messages/s ({rate / results['per message']:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
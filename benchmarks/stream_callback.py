@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from otpclient.client.enums import DatatypeEnum
+from otpclient.client.stream_handler.subscription_potential import SubscriptionPotential
+from otpclient.proto.trade import Trade
+from otpclient.proto.trade_pb2 import Trade as TradeProto
+from otpclient.proto.transmission_message import TransmissionMessage
+from otpclient.proto.transmission_message_pb2 import Message
+
+# GOAL: Measure the messages per second a single core pushes through the callback of a stream subscription, with the
+# previous per-message decoding, the reusing decoder, and the reusing decoder with a prefilter dropping 90% of the
+# messages
+
+COUNT = 200_000
+
+
+class Msg:
+    """Stand-in for nats.aio.msg.Msg, the callback only reads data."""
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+
+class CallbackCapture:
+    """Stand-in for the NATS client, keeps the callback of the subscription instead of subscribing."""
+
+    def __init__(self) -> None:
+        self.cb = None
+
+    async def subscribe(self, topic: str, cb):
+        self.cb = cb
+        return self
+
+
+def sample_messages() -> list[Msg]:
+    messages = []
+    for i in range(COUNT):
+        trade = TradeProto(ID=i, Symbol="AAPL", Exchange="V", Price=100.0, Size=float(i % 1_000),
+                           Timestamp=1_700_000_000 + i, TakerSide="B", Conditions=["@", "I"], Tape="C",
+                           Fingerprint=f"AAPL-{i}", Source="alpaca", AssetClass="stock")
+        message = Message(Topic="alpaca.stock.trades.AAPL", DataType=DatatypeEnum.TRADES.value,
+                          Payload=trade.SerializeToString())
+        messages.append(Msg(message.SerializeToString()))
+    return messages
+
+
+async def received(entity) -> None:
+    pass
+
+
+async def previous_callback(msg: Msg) -> None:
+    """The previous subscription callback: a new message proto, TransmissionMessage and entity proto per message."""
+    payload = TransmissionMessage.load(msg.data).payload
+    await received(Trade.load(payload))
+
+
+async def subscription_callback(**kwargs):
+    capture = CallbackCapture()
+    await SubscriptionPotential(capture, "alpaca.stock.trades.AAPL", DatatypeEnum.TRADES.value).subscribe(
+        received, **kwargs)
+    return capture.cb
+
+
+async def messages_per_second(callback, messages: list[Msg]) -> float:
+    start = time.perf_counter()
+    for msg in messages:
+        await callback(msg)
+    return len(messages) / (time.perf_counter() - start)
+
+
+async def main():
+    messages = sample_messages()
+    results = {
+        "previous": await messages_per_second(previous_callback, messages),
+        "reused protos": await messages_per_second(await subscription_callback(), messages),
+        "reused protos, lazy": await messages_per_second(await subscription_callback(lazy=True), messages),
+        "prefilter (keeps 10%)": await messages_per_second(
+            await subscription_callback(prefilter=lambda trade: trade.Size >= 900), messages),
+    }
+    for name, rate in results.items():
+        print(f"{name:>22}: {rate:12,.0f} messages/s ({rate / results['previous']:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from otpclient.client.enums import AssetClassEnum, DatatypeEnum, StreamRequestOPEnum
+from otpclient.client.stream_handler.subscription_potential import SubscriptionCollection, SubscriptionUpdate
+
+# GOAL: Compare adding topics one update at a time, filtering by symbols and data type, and removing topics in a
+# SubscriptionCollection holding 12,000 topics, with the previous list scans and with the topic index
+
+SYMBOLS = 4_000
+DATA_TYPES = [DatatypeEnum.BAR, DatatypeEnum.QUOTES, DatatypeEnum.TRADES]
+FILTERS = 200
+REMOVED = 2_000
+
+
+class PreviousCollection(SubscriptionCollection):
+    """The previous list based implementation of the collection."""
+
+    def __init__(self, nats_client) -> None:
+        super().__init__(nats_client)
+        self._list = []
+
+    async def _unsafe_filter_subscriptions(self, source=None, asset_class=None, data_types=None, symbols=None,
+                                           active_only=False):
+        subs = self._list
+        if source is not None and len(source) != 0:
+            subs = [sub for sub in subs if any(s.value in sub.topic for s in source)]
+        if asset_class is not None and len(asset_class) != 0:
+            subs = [sub for sub in subs if any(a.value in sub.topic for a in asset_class)]
+        if data_types is not None and len(data_types) != 0:
+            subs = [sub for sub in subs if any(d.value == sub.data_type for d in data_types)]
+        if symbols is not None and len(symbols) != 0:
+            subs = [sub for sub in subs if any(s in sub.topic for s in symbols)]
+        return subs
+
+    async def _unsafe_update_delete(self, update: SubscriptionUpdate) -> None:
+        for _, topics in update.topics.items():
+            for topic in topics:
+                for sub_potential in self._list:
+                    if sub_potential.topic == topic:
+                        await sub_potential.unsubscribe()
+                        if update.server_bound:
+                            self._list.remove(sub_potential)
+                        break
+
+    async def _unsafe_update_add(self, update: SubscriptionUpdate) -> None:
+        sps = await update.to_sub_potential(self._nc)
+        existing_topics = [sp.topic for sp in self._list]
+        for sp in sps:
+            if sp.topic not in existing_topics:
+                self._list.append(sp)
+
+
+def topic(i: int, data_type: DatatypeEnum) -> str:
+    asset_class = AssetClassEnum.CRYPTO if i % 2 else AssetClassEnum.STOCK
+    return f"alpaca.{asset_class.value}.{data_type.value}.S{i}"
+
+
+async def measure(collection: SubscriptionCollection) -> dict[str, float]:
+    timings = {}
+    start = time.perf_counter()
+    for i in range(SYMBOLS):
+        for data_type in DATA_TYPES:
+            await collection.update([SubscriptionUpdate({data_type: [topic(i, data_type)]},
+                                                        StreamRequestOPEnum.ADD, server_bound=True)])
+    timings["add"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(FILTERS):
+        await collection.filter_subscriptions(data_types=[DatatypeEnum.QUOTES],
+                                              symbols=[f"S{j}" for j in range(i, i + 10)])
+    timings["filter"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(REMOVED):
+        await collection.update([SubscriptionUpdate({DatatypeEnum.BAR: [topic(i, DatatypeEnum.BAR)]},
+                                                    StreamRequestOPEnum.REMOVE, server_bound=True)])
+    timings["remove"] = time.perf_counter() - start
+    return timings
+
+
+async def main():
+    previous = await measure(PreviousCollection(None))
+    indexed = await measure(SubscriptionCollection(None))
+    print(f"{len(DATA_TYPES) * SYMBOLS:,} topics")
+    for name in previous:
+        print(f"{name:>7}: previous {previous[name]:8.3f}s, indexed {indexed[name]:8.3f}s "
+              f"({previous[name] / indexed[name]:.0f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
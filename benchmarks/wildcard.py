@@ -0,0 +1,65 @@
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from nats.aio.client import Client
+
+from otpclient.client.enums import DatatypeEnum, StreamRequestOPEnum
+from otpclient.client.stream_handler.subscription_potential import SubscriptionCollection, SubscriptionUpdate
+
+# GOAL: Compare the NATS subscriptions, memory and time of subscribing a callback to 2,000 symbols x 3 data types,
+# with one NATS subscription per topic and in wildcard mode
+
+SYMBOLS = 2_000
+DATA_TYPES = [DatatypeEnum.BAR, DatatypeEnum.QUOTES, DatatypeEnum.TRADES]
+
+
+class OfflineClient(Client):
+    """nats-py client that builds its subscriptions (pending queue and delivery task) without sending the protocol
+    commands to a server."""
+
+    async def _send_subscribe(self, sub) -> None:
+        pass
+
+    async def _send_unsubscribe(self, sid: int, limit: int = 0) -> None:
+        pass
+
+
+async def received(entity) -> None:
+    pass
+
+
+async def measure(wildcard: bool) -> tuple[int, float, float]:
+    nc = OfflineClient()
+    collection = SubscriptionCollection(nc, wildcard=wildcard)
+    await collection.update([SubscriptionUpdate(
+        {data_type: [f"alpaca.stock.{data_type.value}.S{i}" for i in range(SYMBOLS)] for data_type in DATA_TYPES},
+        StreamRequestOPEnum.ADD,
+    )])
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    await collection.subscribe_callback(received)
+    elapsed = time.perf_counter() - start
+    # Let the delivery tasks of the subscriptions start
+    await asyncio.sleep(0)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    subscriptions = len(nc._subs)
+    for sub_potential in await collection.get_all_subscriptions():
+        await sub_potential.unsubscribe()
+    return subscriptions, memory / 1e6, elapsed
+
+
+async def main():
+    print(f"{SYMBOLS * len(DATA_TYPES):,} topics")
+    for name, wildcard in (("per topic", False), ("wildcard", True)):
+        subscriptions, memory, elapsed = await measure(wildcard)
+        print(f"{name:>10}: {subscriptions:6,} NATS subscriptions, {memory:8.2f} MB, subscribed in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
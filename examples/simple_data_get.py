@@ -30,7 +30,7 @@ async def main():
     # 4. Print the first 5 data points
     print(f"First 5 data points for BTC/USD Bar data:")
     for d in data[:5]:
-        print(d.__dict__)
+        print(d.to_dict())
 
     # 5. Convert the data to a pandas DataFrame
     df = Bar.list_to_dataframe(data)
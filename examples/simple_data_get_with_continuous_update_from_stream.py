@@ -1,9 +1,8 @@
 import asyncio
 from datetime import datetime, timedelta
 
-import pandas as pd
-
 from otpclient.client.enums import SourceEnum, AssetClassEnum, DatatypeEnum, AccountEnum, TimeFrameEnum
+from otpclient.client.stream_handler.live_frame import LiveFrame
 from otpclient.client.user_client import UserClient
 from otpclient.proto.quote import Quote
 
@@ -30,10 +29,11 @@ async def main():
     # 3. Retrieve the data
     data: list[Quote] = await client.resolve_data(response)
 
-    # 4. Convert the data to a pandas DataFrame
-    df = Quote.list_to_dataframe(data)
+    # 4. Seed a LiveFrame with the data, new data is appended to it without copying the existing rows
+    frame = LiveFrame(Quote)
+    frame.extend(data)
 
-    print("Current dataframe size (after data fetch): ", df.shape)
+    print("Current dataframe size (after data fetch): ", frame.view().shape)
 
     # 5. Subscribe to the data feed
     response, _, _ = await client.dataprovider.stream_add(
@@ -47,20 +47,19 @@ async def main():
     collection = client.dataprovider.get_subscription_collection()
     if collection is None:
         raise Exception("Subscription collection is None")
-    q = asyncio.Queue()
 
-    # Subscribe to streams that match criteria and store the data in a queue
-    await collection.subscribe_queue(q, data_types=[DatatypeEnum.QUOTES], symbols=["BTC/USD"])
+    # Subscribe to streams that match criteria and append the data to the frame
+    await collection.subscribe_live_frame(frame, symbols=["BTC/USD"])
 
-    # 6. Wait to receive 4 data points. Update the dataframe with each new data point
-    for _ in range(4):
-        data = await q.get()
-        df = pd.concat([df, Quote.list_to_dataframe([data])])
-        print("Updated dataframe size (after adding a new row): ", df.shape)
+    # 6. Wait to receive 4 data points, they are appended to the frame as they arrive
+    seeded = frame.appended
+    while frame.appended < seeded + 4:
+        await asyncio.sleep(0.1)
+    print("Updated dataframe size (after adding new rows): ", frame.view().shape)
 
     # 7. Print dataframe
     print("Data as a pandas DataFrame:")
-    print(df)
+    print(frame.to_dataframe())
     # 8. Close client
     await client.close()
 
@@ -1,9 +1,8 @@
 import asyncio
 from datetime import datetime, timedelta
 
-import pandas as pd
-
 from otpclient.client.enums import SourceEnum, AssetClassEnum, DatatypeEnum, AccountEnum, TimeFrameEnum
+from otpclient.client.stream_handler.live_frame import LiveFrame
 from otpclient.client.user_client import UserClient
 from otpclient.proto.bar import Bar
 
@@ -32,12 +31,12 @@ async def main():
     # 3. Retrieve the data
     data: list[Bar] = await client.resolve_data(response)
 
-    # 4. Convert the data to a pandas DataFrame
-    df = Bar.list_to_dataframe(data)
-    df_lock = asyncio.Lock()
+    # 4. Seed a LiveFrame with the data, new data is appended to it without copying the existing rows
+    frame = LiveFrame(Bar)
+    frame.extend(data)
     print("Received initial data")
-    print("Current dataframe size (after data fetch): ", df.shape)
-    print(df.tail(1).index.values[0])
+    print("Current dataframe size (after data fetch): ", frame.view().shape)
+    print(frame.view().tail(1).index.values[0])
 
     # 5. Subscribe to the data feed
     response, _, _ = await client.dataprovider.stream_add(
@@ -56,17 +55,15 @@ async def main():
     # Subscribe to streams that match criteria and store the data in a queue
     await collection.subscribe_queue(q, data_types=[DatatypeEnum.BAR], symbols=["BTC/USD"])
 
-    # 7. Start a task that will update the dataframe with new data points
+    # 7. Start a task that will append new data points to the frame
     async def update_df():
-        nonlocal df
         while True:
             dt: Bar | None = await q.get()
             if dt is None:
                 break
-            async with df_lock:
-                df = pd.concat([df, Bar.list_to_dataframe([dt])])
-                print("Updated dataframe size (after adding a new row): ", df.shape)
-                print(datetime.utcfromtimestamp(dt.timestamp))
+            frame.append(dt)
+            print("Updated dataframe size (after adding a new row): ", frame.view().shape)
+            print(datetime.utcfromtimestamp(dt.timestamp))
 
     t = asyncio.create_task(update_df())
     print("Subscribed to BTC/USD data feed")
@@ -89,17 +86,16 @@ async def main():
     )
 
     data: list[Bar] = await client.resolve_data(response)
-    async with df_lock:
-        df = pd.concat([df, Bar.list_to_dataframe(data)])
-        print("Updated dataframe size (after adding missing 15 minutes of data): ", df.shape)
+    frame.extend(data)
+    print("Updated dataframe size (after adding missing 15 minutes of data): ", frame.view().shape)
 
     q.put_nowait(None)
     t.cancel()
 
     # 10. Print dataframe
-    # Note: this dataframe does not have the 15 minutes gap
+    # Note: this dataframe does not have the 15 minutes gap, the missing data was appended last so the rows are sorted
     print("Data as a pandas DataFrame:")
-    print(df)
+    print(frame.to_dataframe().sort_index())
 
     # 8. Close client
     await client.close()
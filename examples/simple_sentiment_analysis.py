@@ -88,21 +88,18 @@ async def main():
         return
 
     data: list[News] = await client.resolve_data(response)
-    df = News.list_to_dataframe(data)
+    news_df, sentiments_df = News.list_to_dataframes(data)
     print("Sentiment analysis results (aspect based analysis):")
-    print(df)
+    print(news_df)
+    print(sentiments_df)
 
     print("Example of filtering sentiment analysis results:")
-    # Get first news
-    news = df.head(1)
-    sent_first_row = news["sentiments"].values[0]
-
-    # Get all sentiments that did not fail for that news and are from semantic analysis
-    filtered_sent: pd.DataFrame = \
-        sent_first_row[~sent_first_row["failed"] & (sent_first_row["sentiment_analysis_process"] == "semantic")][
-            ["sentiment", "symbol"]]
-    # Add the headline to the DataFrame
-    filtered_sent["headline"] = news["headline"].values[0]
+    # Get all sentiments that did not fail and are from semantic analysis
+    filtered_sent: pd.DataFrame = sentiments_df[
+        ~sentiments_df["failed"] & (sentiments_df["sentiment_analysis_process"] == "semantic")]
+    # Add the headline of the news each sentiment refers to
+    filtered_sent = filtered_sent.merge(news_df[["id", "headline"]], left_on="news_id", right_on="id")[
+        ["sentiment", "symbol", "headline"]]
 
     # Print a csv dump of the data
     print(filtered_sent.to_csv(index=False))
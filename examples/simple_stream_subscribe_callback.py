@@ -32,7 +32,7 @@ async def main():
     q = asyncio.Queue()
 
     async def print_data(data: Quote):
-        print(data.__dict__)
+        print(data.to_dict())
         await q.put(None)
 
     # 4. Client-side subscribe through the subscription potentials
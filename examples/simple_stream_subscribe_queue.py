@@ -41,7 +41,7 @@ async def main():
     for _ in range(4):
         data = await q.get()
         # Print the data
-        print(data.__dict__)
+        print(data.to_dict())
 
     # 8. Clean up
     await client.close()
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from otpclient.client.defaults import CACHE_MAX_SIZE_BYTES
+from otpclient.client.enums import SourceEnum, AssetClassEnum, DatatypeEnum, TimeFrameEnum
+from otpclient.logging.logger import log
+
+CacheKey = tuple[SourceEnum, AssetClassEnum, str, DatatypeEnum, TimeFrameEnum]
+
+_INDEX_FILE = "index.json"
+_LENGTH = struct.Struct("<I")
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge overlapping or touching [start, end) ranges."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(start: int, end: int, covered: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Return the parts of [start, end) that are not in the given merged ranges."""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class DataCache:
+    """DataCache is a persistent on-disk cache for historical data. Data is stored per (source, asset_class, symbol,
+    data_type, time_frame) as zlib compressed chunks of raw transmission messages, each chunk covering the time range
+    [start, end) (unix seconds) it was requested for. The union of the chunks of a key is the time range that does
+    not need to be requested again. When the total size of the chunks goes over max_size_bytes, the least recently
+    used chunks are evicted. Reads only update the last access times in memory, they are written to disk with the
+    index on the next put, or by flush."""
+    logger = log
+
+    def __init__(self, path: str | Path, max_size_bytes: int = CACHE_MAX_SIZE_BYTES, compression_level: int = 6):
+        self.path = Path(path)
+        self.max_size_bytes = max_size_bytes
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._index: dict[str, list[dict]] = self._load_index()
+        # True if last access times changed since the index was last saved
+        self._dirty = False
+
+        self.logger = self.logger.bind(cache_path=str(self.path), max_size_bytes=max_size_bytes)
+
+    @staticmethod
+    def _key_str(key: CacheKey) -> str:
+        source, asset_class, symbol, data_type, time_frame = key
+        return "|".join([source.value, asset_class.value, symbol, data_type.value, time_frame.value])
+
+    def _load_index(self) -> dict[str, list[dict]]:
+        index_path = self.path / _INDEX_FILE
+        if not index_path.exists():
+            return {}
+        with open(index_path, "r") as f:
+            return json.load(f)
+
+    def _unsafe_save_index(self) -> None:
+        tmp_path = self.path / f"{_INDEX_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.path / _INDEX_FILE)
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Write the last access times updated by reads to disk."""
+        with self._lock:
+            if self._dirty:
+                self._unsafe_save_index()
+
+    def covered_ranges(self, key: CacheKey) -> list[tuple[int, int]]:
+        """Returns the merged [start, end) ranges stored for the given key."""
+        with self._lock:
+            chunks = self._index.get(self._key_str(key), [])
+            return merge_ranges([(chunk["start"], chunk["end"]) for chunk in chunks])
+
+    def missing_ranges(self, key: CacheKey, start: int, end: int) -> list[tuple[int, int]]:
+        """Returns the parts of [start, end) that are not stored for the given key."""
+        return subtract_ranges(start, end, self.covered_ranges(key))
+
+    def get_chunks(self, key: CacheKey, start: int, end: int) -> list[tuple[int, int, list[bytes]]]:
+        """Returns the (start, end, raw messages) of the chunks overlapping [start, end), ordered by start. Chunks
+        can extend past the requested range, filtering the decoded data is up to the caller."""
+        out: list[tuple[int, int, list[bytes]]] = []
+        with self._lock:
+            chunks = self._index.get(self._key_str(key), [])
+            now = time.time()
+            for chunk in sorted(chunks, key=lambda c: c["start"]):
+                if chunk["end"] <= start or chunk["start"] >= end:
+                    continue
+                with open(self.path / chunk["file"], "rb") as f:
+                    out.append((chunk["start"], chunk["end"], self._decode_chunk(f.read())))
+                chunk["last_access"] = now
+                self._dirty = True
+        return out
+
+    def get(self, key: CacheKey, start: int, end: int) -> list[bytes]:
+        """Returns the raw messages of all chunks overlapping [start, end), in chunk start order. Chunks can extend
+        past the requested range, filtering the decoded data is up to the caller."""
+        return [message for _, _, messages in self.get_chunks(key, start, end) for message in messages]
+
+    def put(self, key: CacheKey, start: int, end: int, messages: list[bytes]) -> None:
+        """Store the raw messages returned for [start, end) of the given key."""
+        key_str = self._key_str(key)
+        digest = hashlib.sha1(key_str.encode()).hexdigest()
+        file_name = f"{digest}-{start}-{end}.bin"
+        data = zlib.compress(b"".join(_LENGTH.pack(len(m)) + m for m in messages), self.compression_level)
+
+        with self._lock:
+            tmp_path = self.path / f"{file_name}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path / file_name)
+
+            chunks = self._index.setdefault(key_str, [])
+            chunks[:] = [c for c in chunks if c["file"] != file_name]
+            chunks.append({"start": start, "end": end, "file": file_name, "size": len(data),
+                           "last_access": time.time()})
+            self._unsafe_evict()
+            self._unsafe_save_index()
+
+    def _unsafe_evict(self) -> None:
+        """Evict least recently used chunks until the cache fits in max_size_bytes. Only use while holding the
+        lock!"""
+        entries = [(chunk["last_access"], key_str, chunk)
+                   for key_str, chunks in self._index.items() for chunk in chunks]
+        total = sum(chunk["size"] for _, _, chunk in entries)
+        if total <= self.max_size_bytes:
+            return
+        entries.sort(key=lambda e: e[0])
+        for _, key_str, chunk in entries:
+            if total <= self.max_size_bytes:
+                break
+            self._index[key_str].remove(chunk)
+            if len(self._index[key_str]) == 0:
+                del self._index[key_str]
+            (self.path / chunk["file"]).unlink(missing_ok=True)
+            total -= chunk["size"]
+            self.logger.debug("Evicted cache chunk", key=key_str, start=chunk["start"], end=chunk["end"])
+
+    @staticmethod
+    def _decode_chunk(data: bytes) -> list[bytes]:
+        raw = zlib.decompress(data)
+        messages = []
+        offset = 0
+        while offset < len(raw):
+            (length,) = _LENGTH.unpack_from(raw, offset)
+            offset += _LENGTH.size
+            messages.append(raw[offset:offset + length])
+            offset += length
+        return messages
+
+    def size_bytes(self) -> int:
+        """Returns the total compressed size of the stored chunks."""
+        with self._lock:
+            return sum(chunk["size"] for chunks in self._index.values() for chunk in chunks)
+
+    def clear(self) -> None:
+        """Remove all stored data."""
+        with self._lock:
+            for chunks in self._index.values():
+                for chunk in chunks:
+                    (self.path / chunk["file"]).unlink(missing_ok=True)
+            self._index = {}
+            self._unsafe_save_index()
@@ -1,20 +1,30 @@
 import asyncio
+import math
 from abc import ABC
-from datetime import datetime, timedelta
-from typing import Any, List
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, List
 
 import nats
-from nats.aio.client import Client
+import numpy as np
+import pandas as pd
+from nats.aio.client import Client, Subscription
 
-from otpclient.client.defaults import NATS_SERVER_URL
+from otpclient.client.cache import DataCache, merge_ranges, subtract_ranges
+from otpclient.client.defaults import NATS_SERVER_URL, DATA_ITER_BUFFER_SIZE, SHARD_WINDOWS, SHARD_CONCURRENCY, \
+    CACHE_MIN_AGE, RESOLVE_MAX_SUBSCRIBERS, RESOLVE_MESSAGES_PER_SUBSCRIBER, RESOLVE_MIN_PENDING_MSGS, \
+    RESOLVE_PENDING_BYTES_LIMIT, RESOLVE_DROP_CHECK_INTERVAL_SEC, PROCESS_DECODE_THRESHOLD, PARQUET_BATCH_SIZE
+from otpclient.client.decoding import DecodePool, MessageDecoder, default_decode_pool, decode_messages, \
+    decode_columns, message_loadable
 from otpclient.client.enums import OPStatusEnum, DatatypeEnum, SourceEnum, AssetClassEnum, AccountEnum, TimeFrameEnum, \
     DataRequestOPEnum
-from otpclient.client.exception import ServerError, CancelledError
+from otpclient.client.exception import ServerError, CancelledError, MessagesDroppedError
 from otpclient.client.request.data_request import DataRequest
+from otpclient.client.response.partial_data import PartialData
 from otpclient.client.response.response import DataResponse
-from otpclient.client.stream_handler.entity_mapping import loadable_map
 from otpclient.logging.logger import log
-from otpclient.proto.transmission_message import TransmissionMessage
+from otpclient.proto.arrow import write_parquet_iter
+from otpclient.proto.columnar import columns_to_dataframe, supports_columns
+from otpclient.proto.postprocess import entity_timestamp, sort_dedup_entities, sort_dedup_columns
 
 
 def extract_queue_count(topic: str) -> int:
@@ -22,6 +32,52 @@ def extract_queue_count(topic: str) -> int:
     return int(topic.split(".")[-1])
 
 
+def split_time_range(start_time: datetime, end_time: datetime,
+                     window: timedelta) -> list[tuple[datetime, datetime]]:
+    """Split [start_time, end_time] into consecutive windows of at most the given size, each starting where the
+    previous one ends. Requests include their end time, so the data on a window boundary is in both windows."""
+    if window <= timedelta(0):
+        raise ValueError("window must be positive")
+    windows = []
+    window_start = start_time
+    while window_start < end_time:
+        window_end = min(window_start + window, end_time)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
+
+
+def covered_range(entities: list[Any]) -> tuple[int, int] | None:
+    """Returns the (first, last) timestamp of entities sorted by timestamp, None if there are none."""
+    if len(entities) == 0:
+        return None
+    return entity_timestamp(entities[0]), entity_timestamp(entities[-1])
+
+
+class ResponseSubscriptions:
+    """Queue subscriptions a data response is resolved with. NATS counts every message it receives for a
+    subscription in its delivered counter, the message is then either pending, handed to the callback or dropped
+    because the subscription is a slow consumer. Dropped messages are thus counted from the subscriptions themselves,
+    whatever error callback the NATS connection was created with."""
+
+    def __init__(self, callback: Callable[[nats.aio.msg.Msg], Awaitable[None]]):
+        self.subs: list[Subscription] = []
+        self.handled = 0
+        self._callback = callback
+
+    async def callback(self, msg: nats.aio.msg.Msg) -> None:
+        self.handled += 1
+        await self._callback(msg)
+
+    def dropped(self) -> int:
+        """Returns the number of messages dropped by NATS on the subscriptions so far."""
+        return sum(s.delivered - s.pending_msgs for s in self.subs) - self.handled
+
+    async def unsubscribe(self) -> None:
+        for s in self.subs:
+            await s.unsubscribe()
+
+
 class OtpClient(ABC):
     """Abstract base class for OTP clients"""
     logger = log
@@ -29,6 +85,20 @@ class OtpClient(ABC):
     def __init__(self, nats_client: Client):
         self.nc = nats_client
         self.command_topic: str = ""
+        self.cache: DataCache | None = None
+        # Data response subscription fan-out settings, see _subscribe_response
+        self.resolve_max_subscribers: int = RESOLVE_MAX_SUBSCRIBERS
+        self.resolve_messages_per_subscriber: int = RESOLVE_MESSAGES_PER_SUBSCRIBER
+        self.resolve_min_pending_msgs: int = RESOLVE_MIN_PENDING_MSGS
+        self.resolve_pending_bytes_limit: int = RESOLVE_PENDING_BYTES_LIMIT
+        self.resolve_drop_check_interval_sec: float = RESOLVE_DROP_CHECK_INTERVAL_SEC
+        # Responses with at least this many messages are decoded in decode_pool, None disables it
+        self.process_decode_threshold: int | None = PROCESS_DECODE_THRESHOLD
+        self.decode_pool: DecodePool = default_decode_pool
+
+    def set_cache(self, cache: DataCache | None) -> None:
+        """Set the DataCache used by data_get_autoresolve, None disables caching."""
+        self.cache = cache
 
     async def data_get_autoresolve(
             self,
@@ -40,8 +110,30 @@ class OtpClient(ABC):
             start_time: datetime,
             end_time: datetime,
             time_frame: TimeFrameEnum,
-            timeout_sec: int = 60) -> List[Any]:
-        """Request data and resolve it in one go."""
+            timeout_sec: int = 60,
+            shard: bool = False,
+            shard_window: timedelta | None = None,
+            max_concurrency: int = SHARD_CONCURRENCY,
+            use_cache: bool = True,
+            sort_dedup: bool = False) -> List[Any]:
+        """Request data and resolve it in one go. If shard is True, the time range is split into windows (sized by
+        time_frame unless shard_window is given) that are requested and resolved concurrently, at most
+        max_concurrency at a time. If a DataCache is set on the client and use_cache is True, only the parts of the
+        time range that are not cached are requested. Data merged from several windows or cached chunks is always
+        sorted by timestamp, with the entities repeated on their boundaries dropped by fingerprint. If sort_dedup is
+        True, the data is sorted and deduplicated in the same way when it comes from a single response, as in
+        resolve_data."""
+        if self.cache is not None and use_cache:
+            return await self._data_get_cached(source, asset_class, symbol, data_type, account, start_time, end_time,
+                                               time_frame, timeout_sec, shard, shard_window, max_concurrency,
+                                               sort_dedup)
+        if shard:
+            windows = split_time_range(start_time, end_time, shard_window or SHARD_WINDOWS[time_frame])
+            results = await self._data_get_windows_raw(source, asset_class, symbol, data_type, account, windows,
+                                                       time_frame, timeout_sec, max_concurrency)
+            entities = await self._decode([data for result in results for data in result])
+            return sort_dedup_entities(entities) if sort_dedup or len(windows) > 1 else entities
+
         response = await self.data_get(
             source,
             asset_class,
@@ -55,7 +147,115 @@ class OtpClient(ABC):
             timeout_sec
         )
 
-        return await self.resolve_data(response, timeout_sec)
+        return await self.resolve_data(response, timeout_sec, sort_dedup=sort_dedup)
+
+    async def _data_get_windows_raw(
+            self,
+            source: SourceEnum,
+            asset_class: AssetClassEnum,
+            symbol: str,
+            data_type: DatatypeEnum,
+            account: AccountEnum,
+            windows: list[tuple[datetime, datetime]],
+            time_frame: TimeFrameEnum,
+            timeout_sec: int,
+            max_concurrency: int) -> list[list[bytes]]:
+        """Request and resolve each time window concurrently, at most max_concurrency at a time. Returns the raw
+        messages of each window in window order."""
+        self.logger.info("Requesting windowed data get", symbol=symbol, data_type=data_type,
+                         windows=len(windows), max_concurrency=max_concurrency)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _get_window(window_start: datetime, window_end: datetime) -> list[bytes]:
+            async with semaphore:
+                response = await self.data_get(source, asset_class, symbol, data_type, account, window_start,
+                                               window_end, time_frame, False, timeout_sec)
+                return await self._resolve_raw(response, timeout_sec)
+
+        return list(await asyncio.gather(*[_get_window(ws, we) for ws, we in windows]))
+
+    async def _data_get_cached(
+            self,
+            source: SourceEnum,
+            asset_class: AssetClassEnum,
+            symbol: str,
+            data_type: DatatypeEnum,
+            account: AccountEnum,
+            start_time: datetime,
+            end_time: datetime,
+            time_frame: TimeFrameEnum,
+            timeout_sec: int,
+            shard: bool,
+            shard_window: timedelta | None,
+            max_concurrency: int,
+            sort_dedup: bool) -> List[Any]:
+        key = (source, asset_class, symbol, data_type, time_frame)
+        start_time_unix = int(start_time.timestamp())
+        end_time_unix = int(end_time.timestamp())
+        # The chunks are read along with the coverage, puts of concurrent requests can evict them afterwards
+        cached = await asyncio.to_thread(self.cache.get_chunks, key, start_time_unix, end_time_unix)
+        missing = subtract_ranges(start_time_unix, end_time_unix,
+                                  merge_ranges([(chunk_start, chunk_end) for chunk_start, chunk_end, _ in cached]))
+
+        windows: list[tuple[datetime, datetime]] = []
+        for missing_start, missing_end in missing:
+            missing_start_time = datetime.fromtimestamp(missing_start, tz=timezone.utc)
+            missing_end_time = datetime.fromtimestamp(missing_end, tz=timezone.utc)
+            if shard:
+                windows.extend(split_time_range(missing_start_time, missing_end_time,
+                                                shard_window or SHARD_WINDOWS[time_frame]))
+            else:
+                windows.append((missing_start_time, missing_end_time))
+        self.logger.info("Resolving data get through cache", symbol=symbol, data_type=data_type,
+                         missing_ranges=len(missing))
+
+        results = await self._data_get_windows_raw(source, asset_class, symbol, data_type, account, windows,
+                                                   time_frame, timeout_sec, max_concurrency)
+
+        # Only store windows old enough for the broker to have all of their data
+        store_before = datetime.now(tz=timezone.utc) - CACHE_MIN_AGE
+        for (window_start, window_end), result in zip(windows, results):
+            if window_end <= store_before:
+                await asyncio.to_thread(self.cache.put, key, int(window_start.timestamp()),
+                                        int(window_end.timestamp()), result)
+
+        # Cached chunks and requested windows do not overlap, ordering them by start keeps the time range order
+        segments = [(chunk_start, messages) for chunk_start, _, messages in cached]
+        segments.extend((int(window_start.timestamp()), result) for (window_start, _), result in zip(windows, results))
+        segments.sort(key=lambda segment: segment[0])
+        entities = [entity for entity in await self._decode([data for _, messages in segments for data in messages])
+                    if start_time_unix <= entity_timestamp(entity) <= end_time_unix]
+        # Adjacent segments share their boundary timestamp
+        return sort_dedup_entities(entities) if sort_dedup or len(segments) > 1 else entities
+
+    async def data_get_iter(
+            self,
+            source: SourceEnum,
+            asset_class: AssetClassEnum,
+            symbol: str,
+            data_type: DatatypeEnum,
+            account: AccountEnum,
+            start_time: datetime,
+            end_time: datetime,
+            time_frame: TimeFrameEnum,
+            timeout_sec: int = 60,
+            buffer_size: int = DATA_ITER_BUFFER_SIZE) -> AsyncIterator[Any]:
+        """Request data and yield each entity as soon as it is received and decoded."""
+        response = await self.data_get(
+            source,
+            asset_class,
+            symbol,
+            data_type,
+            account,
+            start_time,
+            end_time,
+            time_frame,
+            False,
+            timeout_sec
+        )
+
+        async for entity in self.iter_data(response, timeout_sec, buffer_size):
+            yield entity
 
     async def data_get(
             self,
@@ -117,52 +317,270 @@ class OtpClient(ABC):
         """Close the client."""
         await self.nc.close()
 
-    async def resolve_data(self, data_response: DataResponse, timeout_sec: int = 60) -> List[Any]:
-        """Resolve DataResponse to data."""
+    def _response_fan_out(self, expected_count: int, ordered: bool = False) -> tuple[int, int]:
+        """Returns the number of queue subscriptions and the pending messages limit of each subscription used to
+        resolve a response of expected_count messages. If ordered is True, a single subscription is used, so that the
+        messages are received in the order OTP sent them."""
+        subscribers = math.ceil(expected_count / self.resolve_messages_per_subscriber)
+        subscribers = max(1, min(1 if ordered else self.resolve_max_subscribers, subscribers))
+        # Queue group delivery is not perfectly balanced, leave room for twice the fair share
+        pending_msgs = max(self.resolve_min_pending_msgs, 2 * math.ceil(expected_count / subscribers))
+        return subscribers, pending_msgs
+
+    async def _subscribe_response(self, data_response: DataResponse,
+                                  callback: Callable[[nats.aio.msg.Msg], Awaitable[None]],
+                                  pending_msgs_limit: int | None = None,
+                                  ordered: bool = False) -> ResponseSubscriptions:
+        """Subscribe the given callback to the response topic and ask OTP to start sending the data. The number of
+        subscriptions and their pending limits are derived from the expected message count, unless pending_msgs_limit
+        is given. ordered is passed to _response_fan_out."""
+        expected_count = extract_queue_count(data_response.ResponseTopic)
+        subscribers, pending_msgs = self._response_fan_out(expected_count, ordered)
+        if pending_msgs_limit is not None:
+            pending_msgs = pending_msgs_limit
+        subs = ResponseSubscriptions(callback)
+        try:
+            for _ in range(subscribers):
+                sub = await self.nc.subscribe(data_response.ResponseTopic, queue="queue", cb=subs.callback,
+                                              pending_msgs_limit=pending_msgs,
+                                              pending_bytes_limit=self.resolve_pending_bytes_limit)
+                subs.subs.append(sub)
+            await self.nc.publish(data_response.ResponseTopic, b"")
+        except Exception:
+            await subs.unsubscribe()
+            raise
+        return subs
+
+    async def _wait_response(self, awaitable: Callable[[], Awaitable[Any]], subs: ResponseSubscriptions,
+                             deadline: float) -> Any:
+        """Returns the result of awaitable(), checking every resolve_drop_check_interval_sec whether NATS dropped
+        messages of the response. Raises MessagesDroppedError if it did, and asyncio.TimeoutError once the deadline
+        (in event loop time) is reached."""
+        loop = asyncio.get_running_loop()
+        while True:
+            timeout = min(deadline - loop.time(), self.resolve_drop_check_interval_sec)
+            try:
+                return await asyncio.wait_for(awaitable(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                if subs.dropped() > 0:
+                    raise MessagesDroppedError("Data response messages were dropped, the client could not keep up.")
+                if loop.time() >= deadline:
+                    raise
+
+    def _use_process_pool(self, count: int, use_process_pool: bool | None) -> bool:
+        if use_process_pool is not None:
+            return use_process_pool
+        return self.process_decode_threshold is not None and count >= self.process_decode_threshold
+
+    async def _decode(self, protos: list[bytes], use_process_pool: bool | None = None) -> list[Any]:
+        """Decode raw transmission messages to entities, in the decode pool if use_process_pool is True, or if it is
+        None and there are at least process_decode_threshold messages."""
+        if self._use_process_pool(len(protos), use_process_pool):
+            return await self.decode_pool.decode(protos)
+        return decode_messages(protos)
+
+    async def _resolve_raw(self, data_response: DataResponse, timeout_sec: int = 60,
+                           allow_partial: bool = False) -> list[bytes]:
+        """Resolve DataResponse to the raw transmission messages carrying the data. If allow_partial is True, the
+        messages received so far are returned on timeout or on dropped messages instead of raising."""
+        received, _ = await self._resolve_raw_prefix(data_response, timeout_sec, allow_partial)
+        return received
+
+    async def _resolve_raw_prefix(self, data_response: DataResponse, timeout_sec: int = 60,
+                                  allow_partial: bool = False, ordered: bool = False) -> tuple[list[bytes], bool]:
+        """Same as _resolve_raw, also returning whether the received messages are the first messages OTP sent. They
+        are if all of them were received, or if they were received by a single subscription that dropped none:
+        the messages pending in the buffers of the other subscriptions are lost when resolution ends early. If
+        ordered is True, the response is resolved with a single subscription whatever its size, so that the messages
+        received are the first ones unless some were dropped."""
         if data_response.Status == OPStatusEnum.FAILURE:
             log.error("Attempted to resolve data from failed response", err=data_response.Err)
             raise Exception(data_response.Err)
-        out_data = []
-
-        current_time = datetime.now()
 
         expected_count = extract_queue_count(data_response.ResponseTopic)
-        q = asyncio.Queue(expected_count)
+        received: list[bytes] = []
+        done = asyncio.Event()
+        if expected_count == 0:
+            done.set()
 
         async def _data_response_callback(msg: nats.aio.msg.Msg) -> None:
-            if msg.data == b"":
+            if msg.data == b"" or done.is_set():
                 return
 
-            await q.put(msg)
+            received.append(msg.data)
+            if len(received) == expected_count:
+                done.set()
 
-        async def _break_on_timeout():
-            while True:
-                if datetime.now() > current_time + timedelta(seconds=timeout_sec):
-                    break
-                await asyncio.sleep(1)
-            await q.put(None)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_sec
+        subs = await self._subscribe_response(data_response, _data_response_callback, ordered=ordered)
+        try:
+            await self._wait_response(done.wait, subs, deadline)
+        except MessagesDroppedError:
+            if not allow_partial:
+                log.error("Data response messages dropped by slow consumer", expected_count=expected_count,
+                          received_count=len(received))
+                raise
+            log.error("Data response messages dropped by slow consumer, returning partial data",
+                      expected_count=expected_count, received_count=len(received))
+        except asyncio.TimeoutError:
+            log.error("Data resolution timed out", expected_count=expected_count, received_count=len(received))
+            if not allow_partial:
+                raise CancelledError("Data resolution timed out.")
+        finally:
+            dropped = subs.dropped()
+            await subs.unsubscribe()
 
-        t = asyncio.create_task(_break_on_timeout())
+        prefix = len(received) >= expected_count or (len(subs.subs) == 1 and dropped == 0)
+        return received, prefix
 
-        subs = []
-        for _ in range(5):
-            subs.append(await self.nc.subscribe(data_response.ResponseTopic, queue="queue", cb=_data_response_callback,
-                                                pending_msgs_limit=1_000_000))
+    async def resolve_data(self, data_response: DataResponse, timeout_sec: int = 60,
+                           use_process_pool: bool | None = None, sort_dedup: bool = False,
+                           lazy: bool = False) -> List[Any]:
+        """Resolve DataResponse to data. Large responses are decoded in the client's decode pool, set
+        use_process_pool to force or to prevent it. Data is returned in arrival order, if sort_dedup is True it is
+        sorted by timestamp and entities with a repeated fingerprint are dropped. If lazy is True, LazyEntity
+        objects that only decode the fields that are accessed are returned."""
+        received = await self._resolve_raw(data_response, timeout_sec)
+        if lazy:
+            entities = decode_messages(received, lazy=True)
+        else:
+            entities = await self._decode(received, use_process_pool)
+        if sort_dedup:
+            return sort_dedup_entities(entities)
+        return entities
 
-        await self.nc.publish(data_response.ResponseTopic, b"")
-        while True:
-            if q.qsize() == expected_count:
-                break
-            await asyncio.sleep(1)
-        for _ in range(expected_count):
-            msg = await q.get()
-            if msg is None:
-                raise CancelledError("Data resolution timed out.")
-            msg = TransmissionMessage.load(msg.data)
-            loadable = loadable_map[DatatypeEnum(msg.data_type)]
-            data = loadable.load(msg.payload)
-            out_data.append(data)
+    async def resolve_data_partial(self, data_response: DataResponse, timeout_sec: int = 60,
+                                   use_process_pool: bool | None = None) -> PartialData:
+        """Resolve DataResponse to data, returning what was received as PartialData instead of failing when the
+        resolution times out or messages are dropped. The response is resolved with a single subscription whatever
+        its size, so that the data received before a timeout is the start of the response and resolve_missing only
+        requests the rest of it."""
+        expected_count = extract_queue_count(data_response.ResponseTopic)
+        received, prefix = await self._resolve_raw_prefix(data_response, timeout_sec, allow_partial=True, ordered=True)
+        entities = sort_dedup_entities(await self._decode(received, use_process_pool))
+        return PartialData(entities, expected_count, len(received), covered_range(entities), prefix)
 
-        for s in subs:
-            await s.unsubscribe()
-        return out_data
+    async def data_get_partial(
+            self,
+            source: SourceEnum,
+            asset_class: AssetClassEnum,
+            symbol: str,
+            data_type: DatatypeEnum,
+            account: AccountEnum,
+            start_time: datetime,
+            end_time: datetime,
+            time_frame: TimeFrameEnum,
+            timeout_sec: int = 60) -> PartialData:
+        """Request data and resolve it in one go, returning what was received as PartialData instead of failing when
+        the resolution times out. Use resolve_missing to request the part that is missing."""
+        response = await self.data_get(source, asset_class, symbol, data_type, account, start_time, end_time,
+                                       time_frame, False, timeout_sec)
+        partial = await self.resolve_data_partial(response, timeout_sec)
+        partial.request = DataRequest("", source, asset_class, symbol, DataRequestOPEnum.GET, data_type, account,
+                                      int(start_time.timestamp()), int(end_time.timestamp()), time_frame, False)
+        partial.requested_range = partial.request.startTime, partial.request.endTime
+        return partial
+
+    async def resolve_missing(self, partial: PartialData, timeout_sec: int = 60) -> PartialData:
+        """Request the missing part of partially resolved data (see data_get_partial and PartialData.missing_range)
+        and merge it with the data already received. The result can be partial again, in which case resolve_missing
+        can be called on it again."""
+        missing = partial.missing_range
+        if missing is None:
+            return partial
+        request = partial.request
+        self.logger.info("Requesting missing part of partial data", symbol=request.symbol,
+                         missing_start=missing[0], missing_end=missing[1])
+        response = await self.data_get(request.source, request.assetClass, request.symbol, request.dataType,
+                                       request.account, datetime.fromtimestamp(missing[0], tz=timezone.utc),
+                                       datetime.fromtimestamp(missing[1], tz=timezone.utc), request.timeFrame,
+                                       False, timeout_sec)
+        return partial.merge_missing(await self.resolve_data_partial(response, timeout_sec))
+
+    async def _decode_columns(self, protos: list[bytes], use_process_pool: bool | None,
+                              sort_dedup: bool) -> dict[str, np.ndarray]:
+        if self._use_process_pool(len(protos), use_process_pool):
+            columns = await self.decode_pool.decode_columns(protos)
+        else:
+            columns = decode_columns(protos)
+        if sort_dedup:
+            return sort_dedup_columns(columns)
+        return columns
+
+    async def resolve_columns(self, data_response: DataResponse, timeout_sec: int = 60,
+                              use_process_pool: bool | None = None, sort_dedup: bool = False
+                              ) -> dict[str, np.ndarray]:
+        """Resolve DataResponse to data decoded straight into one array per entity field. Only entity types that
+        declare columns are supported (e.g. Bar, Quote, Trade). If sort_dedup is True, rows are sorted by timestamp
+        and rows with a repeated fingerprint are dropped."""
+        received = await self._resolve_raw(data_response, timeout_sec)
+        return await self._decode_columns(received, use_process_pool, sort_dedup)
+
+    async def resolve_dataframe(self, data_response: DataResponse, timeout_sec: int = 60,
+                                use_process_pool: bool | None = None, sort_dedup: bool = False) -> pd.DataFrame:
+        """Resolve DataResponse to a DataFrame. Entity types that declare columns are decoded straight into columns,
+        other entity types go through their list_to_dataframe. If sort_dedup is True, rows are sorted by timestamp
+        and rows with a repeated fingerprint are dropped."""
+        received = await self._resolve_raw(data_response, timeout_sec)
+        if len(received) == 0:
+            return pd.DataFrame()
+        loadable = message_loadable(received[0])
+        if not supports_columns(loadable):
+            entities = await self._decode(received, use_process_pool)
+            return loadable.list_to_dataframe(sort_dedup_entities(entities) if sort_dedup else entities)
+        return columns_to_dataframe(loadable, await self._decode_columns(received, use_process_pool, sort_dedup))
+
+    async def iter_data(self, data_response: DataResponse, timeout_sec: int = 60,
+                        buffer_size: int = DATA_ITER_BUFFER_SIZE,
+                        pending_msgs_limit: int | None = None) -> AsyncIterator[Any]:
+        """Resolve DataResponse to data, yielding each entity as soon as it is received, so that the decoded
+        entities are never all held in memory. At most buffer_size raw messages wait for the consumer, when it falls
+        behind the response subscriptions stop reading until there is room again. OTP keeps sending meanwhile, so
+        the raw messages pile up in the NATS pending buffers of the subscriptions, which by default hold the whole
+        response. pending_msgs_limit caps each of these buffers: raw memory is then bounded too, but a consumer that
+        falls further behind makes NATS drop messages and the resolution fail with MessagesDroppedError. The timeout
+        applies to the whole resolution, not to each message."""
+        if data_response.Status == OPStatusEnum.FAILURE:
+            log.error("Attempted to resolve data from failed response", err=data_response.Err)
+            raise Exception(data_response.Err)
+
+        expected_count = extract_queue_count(data_response.ResponseTopic)
+        if expected_count == 0:
+            return
+        q: asyncio.Queue[bytes] = asyncio.Queue(buffer_size)
+
+        async def _data_response_callback(msg: nats.aio.msg.Msg) -> None:
+            if msg.data == b"":
+                return
+
+            await q.put(msg.data)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_sec
+        decode = MessageDecoder().decode
+        subs = await self._subscribe_response(data_response, _data_response_callback, pending_msgs_limit)
+        try:
+            for received_count in range(expected_count):
+                try:
+                    data = await self._wait_response(q.get, subs, deadline)
+                except MessagesDroppedError:
+                    log.error("Data response messages dropped by slow consumer", expected_count=expected_count,
+                              received_count=received_count)
+                    raise
+                except asyncio.TimeoutError:
+                    log.error("Data resolution timed out", expected_count=expected_count,
+                              received_count=received_count)
+                    raise CancelledError("Data resolution timed out.")
+                yield decode(data)
+        finally:
+            await subs.unsubscribe()
+
+    async def resolve_parquet(self, data_response: DataResponse, path: str, timeout_sec: int = 60,
+                              batch_size: int = PARQUET_BATCH_SIZE, buffer_size: int = DATA_ITER_BUFFER_SIZE,
+                              **kwargs: Any) -> int:
+        """Resolve DataResponse straight to a Parquet file, writing batch_size entities at a time as they are
+        received, so that the decoded response is never held in memory (raw messages are buffered as in iter_data).
+        Requires pyarrow. Returns the number of rows written."""
+        return await write_parquet_iter(self.iter_data(data_response, timeout_sec, buffer_size), path, batch_size,
+                                        **kwargs)
@@ -1,10 +1,15 @@
 import asyncio
 import json
+from datetime import datetime
+
+import nats
+import pandas as pd
 
 from nats.aio.client import Client
 
 from otpclient.client.client import OtpClient
-from otpclient.client.enums import AccountEnum, OPStatusEnum
+from otpclient.client.defaults import MANY_SYMBOLS_CONCURRENCY, NATS_SERVER_URL
+from otpclient.client.enums import AccountEnum, OPStatusEnum, TimeFrameEnum
 from otpclient.client.enums import AssetClassEnum
 from otpclient.client.enums import ComponentEnum
 from otpclient.client.enums import DatatypeEnum
@@ -14,6 +19,7 @@ from otpclient.client.enums import StreamRequestOPEnum
 from otpclient.client.exception import ServerError
 from otpclient.client.request.stream_request import StreamRequest
 from otpclient.client.response.response import StreamResponse
+from otpclient.client.stream_handler.entity_mapping import loadable_map
 from otpclient.client.stream_handler.subscription_potential import SubscriptionCollection
 from otpclient.client.stream_handler.subscription_potential import SubscriptionPotential
 from otpclient.client.stream_handler.subscription_potential import SubscriptionUpdate
@@ -21,9 +27,10 @@ from otpclient.client.stream_handler.subscription_potential import SubscriptionU
 
 class DataproviderClient(OtpClient):
     """Client for interacting with the Dataprovider component of the OTP system.
-    This client is used to request data and subscribe to data streams."""
+    This client is used to request data and subscribe to data streams. If wildcard_subscriptions is True, the
+    subscription collection subscribes with NATS wildcards, see SubscriptionCollection."""
 
-    def __init__(self, nats_client: Client):
+    def __init__(self, nats_client: Client, wildcard_subscriptions: bool = False):
         super().__init__(nats_client)
         self.command_topic = (
             f"{ComponentEnum.DATAPROVIDER.value}.{FunctionalityEnum.COMMAND.value}"
@@ -31,12 +38,19 @@ class DataproviderClient(OtpClient):
         self.logger = self.logger.bind(
             command_topic=self.command_topic,
         )
-        self._subscription_collection: SubscriptionCollection | None = SubscriptionCollection(nats_client)
+        self._subscription_collection: SubscriptionCollection | None = SubscriptionCollection(
+            nats_client, wildcard=wildcard_subscriptions)
         self._auto_sync_task: asyncio.Task | None = None
         self._auto_sync_lock = asyncio.Lock()
 
         self.logger.info("DataproviderClient initialized")
 
+    @classmethod
+    async def new(cls, nats_url: str = NATS_SERVER_URL, wildcard_subscriptions: bool = False) -> "DataproviderClient":
+        """Create a new client, connect to given URL and return the client object."""
+        nc = await nats.connect(nats_url)
+        return cls(nc, wildcard_subscriptions)
+
     def get_subscription_collection(self) -> SubscriptionCollection | None:
         """Get the subscription collection for this client. This is used to manage subscriptions."""
         return self._subscription_collection
@@ -48,6 +62,57 @@ class DataproviderClient(OtpClient):
         if self._subscription_collection is not None:
             await self._subscription_collection.update(updates)
 
+    async def data_get_many(
+            self,
+            source: SourceEnum,
+            asset_class: AssetClassEnum,
+            symbols: list[str],
+            data_type: DatatypeEnum,
+            account: AccountEnum,
+            start_time: datetime,
+            end_time: datetime,
+            time_frame: TimeFrameEnum,
+            timeout_sec: int = 60,
+            max_concurrency: int = MANY_SYMBOLS_CONCURRENCY,
+            long_format: bool = False,
+            **autoresolve_kwargs,
+    ) -> tuple[dict[str, pd.DataFrame] | pd.DataFrame, dict[str, Exception]]:
+        """Request and resolve data for multiple symbols concurrently, at most max_concurrency symbols at a time.
+        Returns the data as a {symbol: DataFrame} mapping, or as one DataFrame of all symbols if long_format is True,
+        together with a {symbol: exception} mapping of the symbols that failed. Extra keyword arguments are passed to
+        data_get_autoresolve (e.g. shard=True)."""
+        logger = self.logger.bind(source=source, asset_class=asset_class, symbols=len(symbols), data_type=data_type,
+                                  max_concurrency=max_concurrency)
+        logger.info("Requesting multi-symbol data get")
+        loadable = loadable_map[data_type]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        frames: dict[str, pd.DataFrame] = {}
+        errors: dict[str, Exception] = {}
+
+        async def _get_symbol(symbol: str) -> None:
+            async with semaphore:
+                try:
+                    data = await self.data_get_autoresolve(source, asset_class, symbol, data_type, account,
+                                                           start_time, end_time, time_frame, timeout_sec,
+                                                           **autoresolve_kwargs)
+                except Exception as e:
+                    logger.error("Multi-symbol data get failed for symbol", symbol=symbol, err=str(e))
+                    errors[symbol] = e
+                    return
+            frames[symbol] = loadable.list_to_dataframe(data) if len(data) > 0 else pd.DataFrame()
+
+        await asyncio.gather(*[_get_symbol(symbol) for symbol in symbols])
+        logger.info("Multi-symbol data get finished", failed=len(errors))
+
+        # Keep the order of the requested symbols
+        frames = {symbol: frames[symbol] for symbol in symbols if symbol in frames}
+        if long_format:
+            non_empty = [df for df in frames.values() if not df.empty]
+            if len(non_empty) == 0:
+                return pd.DataFrame(), errors
+            return pd.concat(non_empty).sort_index(kind="stable"), errors
+        return frames, errors
+
     async def stream_add(
             self,
             source: SourceEnum,
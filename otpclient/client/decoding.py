@@ -0,0 +1,139 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+import numpy as np
+
+from otpclient.client.defaults import PROCESS_DECODE_CHUNK_SIZE, PROCESS_DECODE_START_METHOD
+from otpclient.client.stream_handler.entity_mapping import loadable_by_data_type
+from otpclient.logging.logger import log
+from otpclient.proto.codec import intern_columns
+from otpclient.proto.columnar import to_columns
+from otpclient.proto.lazy import LazyEntity
+from otpclient.proto import transmission_message_pb2
+from otpclient.proto.transmission_message import TransmissionMessage
+
+
+def decode_message(data: bytes, lazy: bool = False) -> Any:
+    """Decode a raw transmission message to the entity it carries. If lazy is True, a LazyEntity that decodes the
+    entity on access is returned instead."""
+    msg = TransmissionMessage.load(data)
+    loadable = loadable_by_data_type[msg.data_type]
+    if lazy:
+        return LazyEntity(loadable, msg.payload)
+    return loadable.load(msg.payload)
+
+
+class MessageDecoder:
+    """MessageDecoder decodes raw transmission messages reusing one message proto and one entity proto per entity
+    type, entities copy their fields out of the proto. An instance is meant to be used by a single consumer, like a
+    subscription or a resolution."""
+
+    def __init__(self) -> None:
+        self._message = transmission_message_pb2.Message()  # type: ignore
+        self._protos: dict[Any, Any] = {}
+
+    def decode(self, data: bytes, lazy: bool = False, prefilter: Callable[[Any], bool] | None = None) -> Any:
+        """Decode a raw transmission message to the entity it carries. If prefilter is given, it is called with the
+        parsed entity proto and None is returned without building the entity when it returns False. If lazy is True,
+        a LazyEntity is returned instead of the entity."""
+        message = self._message
+        message.ParseFromString(data)
+        loadable = loadable_by_data_type[message.DataType]
+        payload = message.Payload
+        if lazy and prefilter is None:
+            return LazyEntity(loadable, payload)
+
+        proto = self._protos.get(loadable)
+        if proto is None:
+            proto = self._protos[loadable] = loadable.proto_type()
+        proto.ParseFromString(payload)
+        if prefilter is not None and not prefilter(proto):
+            return None
+        if lazy:
+            return LazyEntity(loadable, payload)
+        return loadable(proto)
+
+
+def decode_messages(protos: list[bytes], lazy: bool = False) -> list[Any]:
+    """Decode raw transmission messages to the entities they carry."""
+    decode = MessageDecoder().decode
+    return [decode(data, lazy) for data in protos]
+
+
+def message_loadable(data: bytes) -> Any:
+    """Returns the entity class of the entity carried by a raw transmission message."""
+    return loadable_by_data_type[TransmissionMessage.load(data).data_type]
+
+
+def decode_columns(protos: list[bytes]) -> dict[str, np.ndarray]:
+    """Decode raw transmission messages carrying entities of the same type straight into columns."""
+    if len(protos) == 0:
+        return {}
+    payloads = (payload for _, payload in TransmissionMessage.iter_payloads(protos))
+    return to_columns(message_loadable(protos[0]), payloads, len(protos))
+
+
+class DecodePool:
+    """DecodePool decodes large batches of raw transmission messages in worker processes, so that protobuf parsing
+    of big responses does not block the event loop. The worker processes are started on first use with start_method
+    (forkserver by default, spawn where it is not available) rather than forked from the client process, which holds
+    the NATS connection and runs threads. Each worker then imports the client modules once, the first decode pays this
+    startup (a second or two) and the workers are reused afterwards. As with any spawned process, the main module of
+    the program must guard its entry point with if __name__ == "__main__"."""
+    logger = log
+
+    def __init__(self, max_workers: int | None = None, chunk_size: int = PROCESS_DECODE_CHUNK_SIZE,
+                 start_method: str = PROCESS_DECODE_START_METHOD):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = "spawn"
+        self.start_method = start_method
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self.logger.info("Starting decode process pool", max_workers=self.max_workers,
+                             start_method=self.start_method)
+            self._executor = ProcessPoolExecutor(self.max_workers,
+                                                 mp_context=multiprocessing.get_context(self.start_method))
+        return self._executor
+
+    def _chunks(self, protos: list[bytes]) -> list[list[bytes]]:
+        return [protos[i:i + self.chunk_size] for i in range(0, len(protos), self.chunk_size)]
+
+    async def decode(self, protos: list[bytes]) -> list[Any]:
+        """Decode raw transmission messages to entities in the worker processes, keeping their order. The interned
+        fields of the entities are interned again in this process as they are unpickled."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = await asyncio.gather(*[loop.run_in_executor(executor, decode_messages, chunk)
+                                         for chunk in self._chunks(protos)])
+        return [entity for result in results for entity in result]
+
+    async def decode_columns(self, protos: list[bytes]) -> dict[str, np.ndarray]:
+        """Decode raw transmission messages carrying entities of the same type to columns in the worker
+        processes, keeping their order."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = await asyncio.gather(*[loop.run_in_executor(executor, decode_columns, chunk)
+                                         for chunk in self._chunks(protos)])
+        if len(results) == 0:
+            return {}
+        columns = {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+        # The workers interned the values in their own symbol tables
+        loadable = message_loadable(protos[0])
+        intern_columns(loadable.proto_type, loadable.columns, columns)
+        return columns
+
+    def shutdown(self) -> None:
+        """Stop the worker processes. The pool can still be used afterwards, new workers are started on demand."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# Pool shared by all clients unless a client is given its own
+default_decode_pool = DecodePool()
@@ -1 +1,59 @@
+from datetime import timedelta
+
+from otpclient.client.enums import TimeFrameEnum
+
 NATS_SERVER_URL = "nats://localhost:4222"
+
+# Maximum number of raw messages buffered by OtpClient.iter_data before the consumer is waited on
+DATA_ITER_BUFFER_SIZE = 1_000
+
+# Size of the time windows a sharded data get is split into, per time frame
+SHARD_WINDOWS: dict[TimeFrameEnum, timedelta] = {
+    TimeFrameEnum.ONE_MINUTE: timedelta(days=1),
+    TimeFrameEnum.ONE_HOUR: timedelta(days=60),
+    TimeFrameEnum.ONE_DAY: timedelta(days=5 * 365),
+    TimeFrameEnum.ONE_WEEK: timedelta(days=20 * 365),
+    TimeFrameEnum.ONE_MONTH: timedelta(days=100 * 365),
+    TimeFrameEnum.NO_TIMEFRAME: timedelta(hours=1),
+}
+# Maximum number of shards of a sharded data get that are requested and resolved concurrently
+SHARD_CONCURRENCY = 8
+
+# Maximum total compressed size of a DataCache before least recently used data is evicted
+CACHE_MAX_SIZE_BYTES = 1024 ** 3
+# Data more recent than this is not stored in the DataCache, since the broker might not have it all yet
+CACHE_MIN_AGE = timedelta(minutes=15)
+# Maximum number of symbols of a multi-symbol data get that are requested and resolved concurrently
+MANY_SYMBOLS_CONCURRENCY = 16
+
+# Maximum number of queue subscriptions a data response is resolved with
+RESOLVE_MAX_SUBSCRIBERS = 5
+# Number of expected messages per additional queue subscription when resolving a data response
+RESOLVE_MESSAGES_PER_SUBSCRIBER = 50_000
+# Lower bound for the pending messages limit of each response subscription
+RESOLVE_MIN_PENDING_MSGS = 1_000
+# Pending bytes limit of each response subscription
+RESOLVE_PENDING_BYTES_LIMIT = 128 * 1024 ** 2
+# Interval at which data resolution checks whether NATS dropped response messages of a slow consumer
+RESOLVE_DROP_CHECK_INTERVAL_SEC = 0.1
+
+# Responses with at least this many messages are decoded in a process pool by default
+PROCESS_DECODE_THRESHOLD = 250_000
+# Number of messages decoded per process pool task
+PROCESS_DECODE_CHUNK_SIZE = 25_000
+# Start method of the decode worker processes, fork is unsafe in the threaded client process. Falls back to spawn
+# where it is not available
+PROCESS_DECODE_START_METHOD = "forkserver"
+
+# Maximum number of distinct values kept by the shared symbol table entity fields are interned through
+INTERN_MAX_SIZE = 100_000
+# Number of entities written per Parquet row group when exporting a resolve stream
+PARQUET_BATCH_SIZE = 50_000
+# Initial number of rows of a LiveFrame without a window
+LIVE_FRAME_CAPACITY = 1_024
+# Maximum number of messages of a batch delivered by subscribe_batch
+STREAM_BATCH_SIZE = 1_000
+# Maximum time in milliseconds a message waits in a batch of subscribe_batch before the batch is delivered
+STREAM_BATCH_LATENCY_MS = 50
+# Maximum number of entities held by a BoundedStreamQueue
+STREAM_QUEUE_SIZE = 10_000
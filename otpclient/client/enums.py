@@ -81,3 +81,10 @@ class StreamRequestOPEnum(Enum):
 
 class AccountEnum(Enum):
     DEFAULT = "default"
+
+
+class OverflowPolicyEnum(Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop-oldest"
+    DROP_NEWEST = "drop-newest"
+    CONFLATE = "conflate"
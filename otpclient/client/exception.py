@@ -9,6 +9,11 @@ class NATSException(Exception):
     pass
 
 
+class MessagesDroppedError(NATSException):
+    """Exceptions related to messages dropped by NATS because a subscription could not keep up (slow consumer)."""
+    pass
+
+
 class ServerError(Exception):
     """Exceptions related to OTP server errors."""
     pass
@@ -0,0 +1,75 @@
+from typing import Any
+
+from otpclient.proto.postprocess import entity_timestamp, sort_dedup_entities
+
+
+class PartialData:
+    """PartialData is the result of a data resolution that is allowed to end before all the data was received (e.g.
+    on timeout). It holds the entities that were received, sorted by timestamp, and what is known about the missing
+    part. OTP sends the data in timestamp order, but the received data is only known to be the start of it (prefix)
+    if it was resolved by a single subscription that dropped no messages, as resolve_data_partial does. The received
+    data then covers the requested time range up to the last received timestamp, and the rest of the range is what is
+    missing. Otherwise messages can be missing anywhere in the range, and the whole range is what is missing."""
+
+    def __init__(
+            self,
+            data: list[Any],
+            expected_count: int,
+            received_count: int,
+            covered_range: tuple[int, int] | None,
+            prefix: bool,
+            request: Any = None,
+            requested_range: tuple[int, int] | None = None,
+    ):
+        self.data = data
+        self.expected_count = expected_count
+        self.received_count = received_count
+        # (first, last) unix timestamp of the received data, None if nothing was received
+        self.covered_range = covered_range
+        # True if the received messages are the first messages OTP sent for the request
+        self.prefix = prefix
+        # Request the data was resolved for and its (start, end) unix time range, needed to request the missing part
+        self.request = request
+        self.requested_range = requested_range
+
+    @property
+    def complete(self) -> bool:
+        """Returns True if all the expected data was received."""
+        return self.received_count >= self.expected_count
+
+    @property
+    def missing_range(self) -> tuple[int, int] | None:
+        """Returns the (start, end) unix time range that still has to be requested, None if the data is complete or
+        the request is unknown."""
+        if self.complete or self.requested_range is None:
+            return None
+        if self.covered_range is None or not self.prefix:
+            return self.requested_range
+        # The last timestamp is requested again, it might not have been received in full
+        return self.covered_range[1], self.requested_range[1]
+
+    def merge_missing(self, missing: "PartialData") -> "PartialData":
+        """Returns the data merged with missing, the resolution of a request for its missing_range. Counts are kept
+        against the expected count of the original request, so the result is only complete once all of it was
+        received."""
+        missing_range = self.missing_range
+        if missing_range is None:
+            return self
+        if missing_range == self.requested_range:
+            # The whole range was requested again, its resolution replaces the received count
+            data = sort_dedup_entities(self.data + missing.data)
+            received_count = missing.received_count
+        else:
+            # The entities from the start of the missing range on were requested again
+            kept = [e for e in self.data if entity_timestamp(e) < missing_range[0]]
+            data = kept + missing.data
+            received_count = len(kept) + missing.received_count
+        # All of the missing part was received but data is still missing, so it is missing before that part
+        prefix = missing.prefix and (not missing.complete or received_count >= self.expected_count)
+        covered_range = (entity_timestamp(data[0]), entity_timestamp(data[-1])) if len(data) > 0 else None
+        return PartialData(data, self.expected_count, received_count, covered_range, prefix, self.request,
+                           self.requested_range)
+
+    def __repr__(self) -> str:
+        return (f"PartialData(received_count={self.received_count}, expected_count={self.expected_count}, "
+                f"covered_range={self.covered_range}, prefix={self.prefix})")
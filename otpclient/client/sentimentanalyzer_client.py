@@ -1,14 +1,16 @@
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
 
 from nats.aio.client import Client
 
 from otpclient.client.client import OtpClient
+from otpclient.client.defaults import DATA_ITER_BUFFER_SIZE
 from otpclient.client.enums import SourceEnum, DataRequestOPEnum, SentimentAnalysisProcessEnum, LLMProviderEnum, \
     OPStatusEnum, ComponentEnum, FunctionalityEnum
 from otpclient.client.exception import ServerError, CancelledError
 from otpclient.client.request.request import CancelRemote
 from otpclient.client.request.sentimentanalysis_request import SentimentAnalysisRequest
+from otpclient.client.response.partial_data import PartialData
 from otpclient.client.response.response import DataResponse, Response
 
 
@@ -70,6 +72,106 @@ class SentimentAnalyzerClient(OtpClient):
         )
         return await self.resolve_data(response, timeout_sec)
 
+    async def data_get_iter(self,
+                            source: SourceEnum,
+                            symbol: str,
+                            start_time: datetime,
+                            end_time: datetime,
+                            sentiment_analysis_process: SentimentAnalysisProcessEnum,
+                            model: str,
+                            model_provider: LLMProviderEnum,
+                            system_prompt: str,
+                            retry_failed: bool = False,
+                            fail_fast_on_bad_sentiment: bool = False,
+                            timeout_sec: int = 60,
+                            cancel_remote: CancelRemote = None,
+                            buffer_size: int = DATA_ITER_BUFFER_SIZE,
+                            ) -> AsyncIterator[Any]:
+        """Request data and yield each entity as soon as it is received and decoded."""
+        response = await self.data_get(
+            source,
+            symbol,
+            start_time,
+            end_time,
+            sentiment_analysis_process,
+            model,
+            model_provider,
+            system_prompt,
+            retry_failed,
+            fail_fast_on_bad_sentiment,
+            False,
+            timeout_sec,
+            cancel_remote
+        )
+        async for entity in self.iter_data(response, timeout_sec, buffer_size):
+            yield entity
+
+    async def data_get_partial(self,
+                               source: SourceEnum,
+                               symbol: str,
+                               start_time: datetime,
+                               end_time: datetime,
+                               sentiment_analysis_process: SentimentAnalysisProcessEnum,
+                               model: str,
+                               model_provider: LLMProviderEnum,
+                               system_prompt: str,
+                               retry_failed: bool = False,
+                               fail_fast_on_bad_sentiment: bool = False,
+                               timeout_sec: int = 60,
+                               cancel_remote: CancelRemote = None
+                               ) -> PartialData:
+        """Request data and resolve it in one go, returning what was received as PartialData instead of failing when
+        the resolution times out. Use resolve_missing to request the part that is missing."""
+        response = await self.data_get(
+            source,
+            symbol,
+            start_time,
+            end_time,
+            sentiment_analysis_process,
+            model,
+            model_provider,
+            system_prompt,
+            retry_failed,
+            fail_fast_on_bad_sentiment,
+            False,
+            timeout_sec,
+            cancel_remote
+        )
+        partial = await self.resolve_data_partial(response, timeout_sec)
+        partial.request = SentimentAnalysisRequest(source, symbol, DataRequestOPEnum.GET, int(start_time.timestamp()),
+                                                   int(end_time.timestamp()), False, sentiment_analysis_process, model,
+                                                   model_provider, system_prompt, fail_fast_on_bad_sentiment,
+                                                   retry_failed, cancel_remote)
+        partial.requested_range = partial.request.StartTime, partial.request.EndTime
+        return partial
+
+    async def resolve_missing(self, partial: PartialData, timeout_sec: int = 60) -> PartialData:
+        """Request the missing part of partially resolved data (see data_get_partial) and merge it with the data
+        already received. The result can be partial again, in which case resolve_missing can be called on it
+        again."""
+        missing = partial.missing_range
+        if missing is None:
+            return partial
+        request = partial.request
+        self.logger.info("Requesting missing part of partial data", symbol=request.Symbol,
+                         missing_start=missing[0], missing_end=missing[1])
+        response = await self.data_get(
+            request.Source,
+            request.Symbol,
+            datetime.fromtimestamp(missing[0], tz=timezone.utc),
+            datetime.fromtimestamp(missing[1], tz=timezone.utc),
+            request.SentimentAnalysisProcess,
+            request.Model,
+            request.ModelProvider,
+            request.SystemPrompt,
+            request.RetryFailed,
+            request.FailFastOnBadSentiment,
+            False,
+            timeout_sec,
+            request.CancelRemote
+        )
+        return partial.merge_missing(await self.resolve_data_partial(response, timeout_sec))
+
     async def data_get(self,
                        source: SourceEnum,
                        symbol: str,
@@ -0,0 +1,102 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from otpclient.client.decoding import MessageDecoder, decode_columns
+from otpclient.logging.logger import log
+from otpclient.proto.columnar import entities_to_columns, supports_columns
+
+
+class StreamBatcher:
+    """StreamBatcher collects the raw messages of a stream subscription and delivers them decoded to callback in
+    batches. A batch is delivered when it holds max_batch messages, or max_latency_ms after its first message was
+    received. Batches are lists of entities, or {column: numpy array} mappings if columnar is True, and are
+    delivered in order."""
+    logger = log
+
+    def __init__(
+            self,
+            loadable: Any,
+            callback: Callable[[Any], Awaitable[None]],
+            max_batch: int,
+            max_latency_ms: float,
+            columnar: bool = False,
+            prefilter: Callable[[Any], bool] | None = None,
+    ) -> None:
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive")
+        if columnar and not supports_columns(loadable):
+            raise ValueError(f"{loadable.__name__} does not support columnar decoding")
+        self.loadable = loadable
+        self.callback = callback
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000
+        self.columnar = columnar
+        self.prefilter = prefilter
+        self._decode = MessageDecoder().decode
+        self._pending: list[bytes] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Future | None = None
+        self._flush_lock = asyncio.Lock()
+        self.batches = 0
+        self.messages = 0
+
+    async def add(self, data: bytes) -> None:
+        """Add a raw transmission message to the current batch, delivering the batch if it is full."""
+        self._pending.append(data)
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_latency, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        # The task is kept, the event loop only holds a weak reference to it
+        self._flush_task = asyncio.ensure_future(self.flush())
+        self._flush_task.add_done_callback(self._on_flush_done)
+
+    def _on_flush_done(self, task: asyncio.Future) -> None:
+        if self._flush_task is task:
+            self._flush_task = None
+        # Nothing awaits the timer flushes, their errors (e.g. raised by the callback) are logged here
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error("Stream batch delivery failed", loadable=self.loadable.__name__,
+                              err=str(task.exception()))
+
+    def _decode_batch(self, pending: list[bytes]) -> Any:
+        if self.columnar and self.prefilter is None:
+            return decode_columns(pending)
+        entities = [self._decode(data, prefilter=self.prefilter) for data in pending]
+        if self.prefilter is not None:
+            entities = [entity for entity in entities if entity is not None]
+            if len(entities) == 0:
+                return None
+        if self.columnar:
+            return entities_to_columns(self.loadable, entities)
+        return entities
+
+    async def flush(self) -> None:
+        """Deliver the messages received so far, if any."""
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, []
+            if len(pending) == 0:
+                return
+            batch = self._decode_batch(pending)
+            self.messages += len(pending)
+            # All the messages of the batch were dropped by the prefilter
+            if batch is None:
+                return
+            self.batches += 1
+            await self.callback(batch)
+
+    def cancel(self) -> None:
+        """Drop the messages received so far, stop the timer and cancel the delivery it started, if any."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._pending = []
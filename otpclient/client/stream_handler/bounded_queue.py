@@ -0,0 +1,135 @@
+import asyncio
+from collections import deque
+from typing import Any, Callable, Hashable
+
+from otpclient.client.defaults import STREAM_QUEUE_SIZE
+from otpclient.client.enums import OverflowPolicyEnum
+from otpclient.proto.postprocess import entity_type
+
+
+def symbol_key(entity: Any) -> Hashable:
+    """Default conflation key: entities of the same type and symbol replace each other."""
+    return entity_type(entity), entity.symbol
+
+
+class BoundedStreamQueue:
+    """BoundedStreamQueue is a queue holding at most maxsize entities, that applies policy when an entity is put while
+    it is full, so that a slow consumer neither grows memory nor blocks the NATS callback:
+
+    - BLOCK waits for room, like a bounded asyncio.Queue.
+    - DROP_OLDEST drops the oldest entity in the queue.
+    - DROP_NEWEST drops the entity being put.
+    - CONFLATE keeps only the latest entity per key (by default type and symbol, e.g. the last quote of each
+      symbol), in the queue position of the first one. The oldest entity is dropped if the queue is full of
+      distinct keys. Order book updates should only be conflated if the consumer applies them as snapshots.
+
+    dropped and conflated count the entities lost to the policy. The None sentinel put on unsubscribe never waits
+    and is never dropped, even if the queue is full. It has the API of asyncio.Queue (put, get, their nowait
+    variants, task_done and join) and can be passed to subscribe_queue in place of one."""
+
+    def __init__(
+            self,
+            maxsize: int = STREAM_QUEUE_SIZE,
+            policy: OverflowPolicyEnum = OverflowPolicyEnum.DROP_OLDEST,
+            key: Callable[[Any], Hashable] = symbol_key,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key
+        self.dropped = 0
+        self.conflated = 0
+        # Keys in queue order, with the latest entity of each key
+        self._keys: deque[Hashable] = deque()
+        self._latest: dict[Hashable, Any] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def qsize(self) -> int:
+        return len(self._keys)
+
+    def empty(self) -> bool:
+        return len(self._keys) == 0
+
+    def full(self) -> bool:
+        return len(self._keys) >= self.maxsize
+
+    def _append(self, key: Hashable, item: Any) -> None:
+        self._keys.append(key)
+        self._latest[key] = item
+        self._unfinished += 1
+        self._finished.clear()
+        self._not_empty.set()
+
+    def _drop_oldest(self) -> bool:
+        """Drop the oldest entity, skipping None sentinels. Returns False if the queue only holds sentinels."""
+        for i, key in enumerate(self._keys):
+            if self._latest[key] is not None:
+                del self._keys[i]
+                del self._latest[key]
+                self.task_done()
+                self.dropped += 1
+                return True
+        return False
+
+    def put_nowait(self, item: Any) -> None:
+        """Put an entity, applying the policy if the queue is full. Raises asyncio.QueueFull if the policy is BLOCK
+        and the queue is full."""
+        if item is None:
+            self._append(object(), item)
+            return
+        key = self.key(item) if self.policy == OverflowPolicyEnum.CONFLATE else object()
+        if key in self._latest:
+            self._latest[key] = item
+            self.conflated += 1
+            return
+        if self.full():
+            if self.policy == OverflowPolicyEnum.BLOCK:
+                raise asyncio.QueueFull
+            if self.policy == OverflowPolicyEnum.DROP_NEWEST or not self._drop_oldest():
+                self.dropped += 1
+                return
+        self._append(key, item)
+
+    async def put(self, item: Any) -> None:
+        """Put an entity, waiting for room if the policy is BLOCK and the queue is full."""
+        if self.policy == OverflowPolicyEnum.BLOCK and item is not None:
+            while self.full():
+                self._not_full.clear()
+                await self._not_full.wait()
+        self.put_nowait(item)
+
+    def get_nowait(self) -> Any:
+        """Remove and return the oldest entity. Raises asyncio.QueueEmpty if the queue is empty."""
+        if len(self._keys) == 0:
+            raise asyncio.QueueEmpty
+        item = self._latest.pop(self._keys.popleft())
+        self._not_full.set()
+        return item
+
+    async def get(self) -> Any:
+        """Remove and return the oldest entity, waiting for one if the queue is empty."""
+        while len(self._keys) == 0:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def task_done(self) -> None:
+        """Indicate that an entity returned by get was processed, as asyncio.Queue.task_done."""
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        """Wait until every entity put was processed or dropped."""
+        await self._finished.wait()
+
+    def stats(self) -> dict[str, Any]:
+        return {"size": self.qsize(), "maxsize": self.maxsize, "policy": self.policy.value,
+                "dropped": self.dropped, "conflated": self.conflated}
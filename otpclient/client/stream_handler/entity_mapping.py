@@ -21,3 +21,9 @@ loadable_map: dict[DatatypeEnum, ProtoLoadable] = {
     DatatypeEnum.DAILY_BARS: DailyBars,
     DatatypeEnum.UPDATED_BARS: UpdatedBars,
 }
+
+# Mapping of the raw DataType string of transmission messages to ProtoLoadable classes, so that decoding a message
+# does not build a DatatypeEnum
+loadable_by_data_type: dict[str, ProtoLoadable] = {
+    data_type.value: loadable for data_type, loadable in loadable_map.items()
+}
@@ -0,0 +1,131 @@
+from operator import attrgetter
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from otpclient.client.defaults import LIVE_FRAME_CAPACITY
+from otpclient.proto.columnar import columns_to_dataframe, entities_to_columns, storage_dtype, supports_columns
+
+NANOSECONDS = 1_000_000_000
+
+
+class LiveFrame:
+    """LiveFrame keeps the entities of a stream in preallocated NumPy columns, with amortized O(1) appends. Without a
+    window the columns double in size when full. With a window only the last window rows are kept: every row is
+    written twice, window rows apart, so that the last window rows are always contiguous and can be viewed without a
+    copy. An instance can be passed as callback to SubscriptionPotential.subscribe or
+    SubscriptionCollection.subscribe_callback."""
+
+    def __init__(self, loadable: Any, window: int | None = None, capacity: int = LIVE_FRAME_CAPACITY) -> None:
+        if not supports_columns(loadable):
+            raise ValueError(f"{loadable.__name__} does not support columnar decoding")
+        if window is not None and window <= 0:
+            raise ValueError("window must be positive")
+        self.loadable = loadable
+        self.window = window
+        self._names = list(loadable.columns)
+        self._getter = attrgetter(*self._names)
+        self._size = 2 * window if window is not None else max(capacity, 1)
+        # Timestamps are stored as nanoseconds, so that the index of a view is a DatetimeIndex without a copy
+        self._columns = {name: np.empty(self._size, dtype=storage_dtype(dtype))
+                         for name, (_, dtype) in loadable.columns.items()}
+        self._arrays = [self._columns[name] for name in self._names]
+        self._timestamp = self._names.index("timestamp")
+        self._len = 0
+        self._head = 0
+        self.appended = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _grow(self) -> None:
+        self._size *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(self._size, dtype=column.dtype)
+            grown[:self._len] = column[:self._len]
+            self._columns[name] = grown
+        self._arrays = [self._columns[name] for name in self._names]
+
+    def append(self, entity: Any) -> None:
+        """Append an entity as the last row."""
+        values = list(self._getter(entity))
+        values[self._timestamp] *= NANOSECONDS
+        if self.window is None:
+            if self._len == self._size:
+                self._grow()
+            i = self._len
+            for column, value in zip(self._arrays, values):
+                column[i] = value
+            self._len += 1
+        else:
+            i, j = self._head, self._head + self.window
+            for column, value in zip(self._arrays, values):
+                column[i] = value
+                column[j] = value
+            self._head = (self._head + 1) % self.window
+            self._len = min(self._len + 1, self.window)
+        self.appended += 1
+
+    async def __call__(self, entity: Any) -> None:
+        self.append(entity)
+
+    def extend(self, entities: list[Any]) -> None:
+        """Append entities, e.g. the output of OtpClient.resolve_data to seed the frame with historical data."""
+        self.extend_columns(entities_to_columns(self.loadable, entities))
+
+    def extend_columns(self, columns: dict[str, np.ndarray]) -> None:
+        """Append decoded columns, e.g. the output of OtpClient.resolve_columns."""
+        count = len(columns["timestamp"])
+        if count == 0:
+            return
+        values = dict(columns)
+        values["timestamp"] = columns["timestamp"].astype(np.int64) * NANOSECONDS
+        if self.window is None:
+            while self._len + count > self._size:
+                self._grow()
+            for name, column in self._columns.items():
+                column[self._len:self._len + count] = values[name]
+            self._len += count
+        else:
+            # Only the last window rows are kept, written at their positions in the ring and window rows after
+            kept = min(count, self.window)
+            positions = (self._head + np.arange(kept)) % self.window
+            for name, column in self._columns.items():
+                column[positions] = values[name][count - kept:]
+                column[positions + self.window] = values[name][count - kept:]
+            self._head = (self._head + kept) % self.window
+            self._len = min(self._len + kept, self.window)
+        self.appended += count
+
+    def _bounds(self) -> tuple[int, int]:
+        if self.window is None:
+            return 0, self._len
+        end = self._head + self.window
+        return end - self._len, end
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Returns views of the columns of the rows currently in the frame, oldest first. Timestamps are epoch
+        nanoseconds. The views share memory with the frame: with a window, appends overwrite the oldest rows of
+        earlier views, copy them if they must outlive further appends."""
+        start, end = self._bounds()
+        return {name: column[start:end] for name, column in self._columns.items()}
+
+    def view(self) -> pd.DataFrame:
+        """Returns a DataFrame indexed by timestamp that shares memory with the frame, see columns. Categorical
+        columns are left as objects, since converting them would copy."""
+        columns = self.columns()
+        index = pd.DatetimeIndex(columns.pop("timestamp").view("datetime64[ns]"), name="timestamp", copy=False)
+        # Pandas would otherwise convert, and so copy, object columns holding strings
+        with pd.option_context("future.infer_string", False):
+            return pd.DataFrame(columns, index=index, copy=False)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Returns a copy of the rows as a DataFrame with the dtypes of resolve_dataframe."""
+        columns = self.columns()
+        columns["timestamp"] = columns["timestamp"] // NANOSECONDS
+        return columns_to_dataframe(self.loadable, columns)
+
+    def clear(self) -> None:
+        self._len = 0
+        self._head = 0
@@ -0,0 +1,148 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Awaitable, Callable
+
+from otpclient.logging.logger import log
+from otpclient.proto.orderbook import Orderbook
+
+
+class BookSide:
+    """BookSide holds the price levels of one side of an order book, as a price -> size mapping and the list of prices
+    kept sorted ascending. The best level is the lowest price for asks and the highest price for bids."""
+    __slots__ = ("descending", "_sizes", "_prices")
+
+    def __init__(self, descending: bool) -> None:
+        self.descending = descending
+        self._sizes: dict[float, float] = {}
+        self._prices: list[float] = []
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def clear(self) -> None:
+        self._sizes.clear()
+        self._prices.clear()
+
+    def apply(self, price: float, size: float) -> None:
+        """Set the size of the level at the given price, a size of 0 removes the level."""
+        if size == 0:
+            if self._sizes.pop(price, None) is not None:
+                del self._prices[bisect_left(self._prices, price)]
+            return
+        if price not in self._sizes:
+            self._prices.insert(bisect_left(self._prices, price), price)
+        self._sizes[price] = size
+
+    def best(self) -> tuple[float, float] | None:
+        """Returns the (price, size) of the best level, or None if the side is empty."""
+        if len(self._prices) == 0:
+            return None
+        price = self._prices[-1] if self.descending else self._prices[0]
+        return price, self._sizes[price]
+
+    def size_at(self, price: float) -> float:
+        """Returns the size of the level at the given price, 0 if there is no such level."""
+        return self._sizes.get(price, 0.0)
+
+    def levels_through(self, price: float) -> int:
+        """Returns the number of levels priced at or better than the given price."""
+        if self.descending:
+            return len(self._prices) - bisect_left(self._prices, price)
+        return bisect_right(self._prices, price)
+
+    def depth(self, levels: int | None = None) -> list[tuple[float, float]]:
+        """Returns the (price, size) of the best levels, best first. All levels are returned if levels is None."""
+        n = len(self._prices) if levels is None else min(levels, len(self._prices))
+        if self.descending:
+            prices = self._prices[len(self._prices) - n:][::-1]
+        else:
+            prices = self._prices[:n]
+        return [(price, self._sizes[price]) for price in prices]
+
+    def depth_through(self, price: float) -> list[tuple[float, float]]:
+        """Returns the (price, size) of the levels priced at or better than the given price, best first."""
+        return self.depth(self.levels_through(price))
+
+
+class Book:
+    """Book is the local state of the order book of a single symbol."""
+    __slots__ = ("symbol", "exchange", "timestamp", "asks", "bids")
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.exchange = ""
+        self.timestamp = 0
+        self.asks = BookSide(descending=False)
+        self.bids = BookSide(descending=True)
+
+    def apply(self, update: Orderbook) -> None:
+        """Apply an order book update. A reset update replaces the book, other updates only change the levels they
+        carry."""
+        if update.reset:
+            self.asks.clear()
+            self.bids.clear()
+        for entry in update.asks:
+            self.asks.apply(entry.price, entry.size)
+        for entry in update.bids:
+            self.bids.apply(entry.price, entry.size)
+        self.exchange = update.exchange
+        self.timestamp = update.timestamp
+
+    def best_ask(self) -> tuple[float, float] | None:
+        return self.asks.best()
+
+    def best_bid(self) -> tuple[float, float] | None:
+        return self.bids.best()
+
+    def spread(self) -> float | None:
+        """Returns the difference between the best ask and the best bid prices, or None if a side is empty."""
+        ask, bid = self.asks.best(), self.bids.best()
+        if ask is None or bid is None:
+            return None
+        return ask[0] - bid[0]
+
+    def mid_price(self) -> float | None:
+        """Returns the price halfway between the best ask and the best bid, or None if a side is empty."""
+        ask, bid = self.asks.best(), self.bids.best()
+        if ask is None or bid is None:
+            return None
+        return (ask[0] + bid[0]) / 2
+
+    def __repr__(self) -> str:
+        return f"Book({self.symbol}, bid={self.best_bid()}, ask={self.best_ask()}, levels={len(self.bids)}/" \
+               f"{len(self.asks)})"
+
+
+class OrderbookState:
+    """OrderbookState maintains the local order books of all symbols from a stream of Orderbook updates. An instance
+    can be passed as callback to SubscriptionPotential.subscribe, on_update is then awaited with the updated Book
+    after every update."""
+    logger = log
+
+    def __init__(self, on_update: Callable[[Book], Awaitable[None]] | None = None) -> None:
+        self.books: dict[str, Book] = {}
+        self.on_update = on_update
+        self.updates = 0
+
+    def apply(self, update: Orderbook) -> Book:
+        """Apply an order book update to the book of its symbol and return the book."""
+        book = self.books.get(update.symbol)
+        if book is None:
+            if not update.reset:
+                self.logger.debug("Order book update received before snapshot", symbol=update.symbol)
+            book = Book(update.symbol)
+            self.books[update.symbol] = book
+        book.apply(update)
+        self.updates += 1
+        return book
+
+    async def __call__(self, update: Any) -> None:
+        book = self.apply(update)
+        if self.on_update is not None:
+            await self.on_update(book)
+
+    def book(self, symbol: str) -> Book | None:
+        """Returns the book of the given symbol, or None if no update for it was received."""
+        return self.books.get(symbol)
+
+    def clear(self) -> None:
+        self.books.clear()
@@ -11,11 +11,16 @@ from otpclient.client.enums import AssetClassEnum
 from otpclient.client.enums import DatatypeEnum
 from otpclient.client.enums import SourceEnum
 from otpclient.client.enums import StreamRequestOPEnum
+from otpclient.client.decoding import MessageDecoder
+from otpclient.client.defaults import STREAM_BATCH_LATENCY_MS, STREAM_BATCH_SIZE
 from otpclient.client.response.response import StreamResponse
+from otpclient.client.stream_handler.batching import StreamBatcher
 from otpclient.client.stream_handler.entity_mapping import loadable_map
+from otpclient.client.stream_handler.live_frame import LiveFrame
+from otpclient.client.stream_handler.topic_index import TopicIndex
+from otpclient.client.stream_handler.wildcard import DispatchSubscription, WildcardDispatcher
 from otpclient.logging.logger import log
 from otpclient.proto.proto_loadable import ProtoLoadable
-from otpclient.proto.transmission_message import TransmissionMessage
 
 
 class SubscriptionUpdate:
@@ -58,21 +63,23 @@ class SubscriptionPotential:
         self._loadable: ProtoLoadable | None = loadable_map.get(
             DatatypeEnum(data_type), None
         )
-        self.subscription: Subscription | None = None
+        self.subscription: Subscription | DispatchSubscription | None = None
         self._subscription_lock = asyncio.Lock()
         self.queue: asyncio.Queue[Any] | None = None
         self._access_queue_lock = asyncio.Lock()
+        self._batcher: StreamBatcher | None = None
+        # Set by a SubscriptionCollection in wildcard mode, messages are then routed by the dispatcher
+        self.dispatcher: WildcardDispatcher | None = None
 
         self.logger = self.logger.bind(topic=topic, data_type=data_type,
                                        loadable=self._loadable.__name__ if self._loadable is not None else None)
 
-    async def subscribe(
-            self, callback: Callable[[Any], Awaitable[None]], replace: bool = False
-    ) -> SubscriptionUpdate | None:
-        """Subscribe to the topic with the given callback. If replace is True, the current subscription will be
-        replaced with the new callback. If replace is False and there is already a subscription, an exception will be
-        raised."""
-        logger = self.logger.bind(replace=replace)
+    async def _subscribe_handler(
+            self, handler: Callable[[Msg], Awaitable[None]], replace: bool, logger: Any,
+            batcher: StreamBatcher | None = None,
+    ) -> SubscriptionUpdate:
+        """Subscribe to the topic with the given handler of raw NATS messages, replacing the current subscription if
+        replace is True."""
         async with self._subscription_lock:
             if self.subscription is not None and not replace:
                 logger.error("Already subscribed to topic")
@@ -81,20 +88,20 @@ class SubscriptionPotential:
             if self.subscription is not None:
                 await self.subscription.unsubscribe()
                 self.subscription = None
+            if self._batcher is not None:
+                self._batcher.cancel()
+                self._batcher = None
 
             if self._loadable is None:
                 logger.error("Cannot load entity type")
                 raise Exception(f"Cannot load {self.data_type}")
 
-            async def _callback(msg: Msg):
-                if self._loadable is None:
-                    logger.error("Cannot load entity type in callback")
-                    raise Exception(f"Cannot load {self.data_type}")
-                entity = self._loadable.load(TransmissionMessage.load(msg.data).payload)
-                await callback(entity)
-
-            subscription = await self._nc.subscribe(self.topic, cb=_callback)
+            if self.dispatcher is not None:
+                subscription = await self.dispatcher.subscribe(self.topic, self.data_type, handler)
+            else:
+                subscription = await self._nc.subscribe(self.topic, cb=handler)
             self.subscription = subscription
+            self._batcher = batcher
 
             logger.info("Subscribed to topic")
 
@@ -102,17 +109,64 @@ class SubscriptionPotential:
                 {DatatypeEnum(self.data_type): [self.topic]}, StreamRequestOPEnum.ADD
             )
 
+    async def subscribe(
+            self, callback: Callable[[Any], Awaitable[None]], replace: bool = False, lazy: bool = False,
+            prefilter: Callable[[Any], bool] | None = None,
+    ) -> SubscriptionUpdate | None:
+        """Subscribe to the topic with the given callback. If replace is True, the current subscription will be
+        replaced with the new callback. If replace is False and there is already a subscription, an exception will be
+        raised. If lazy is True, the callback receives LazyEntity objects that only decode the fields that are
+        accessed. If prefilter is given, it is called with the parsed proto of each message (e.g. lambda trade:
+        trade.Size >= 100) and messages it returns False for are dropped before an entity is built."""
+        logger = self.logger.bind(replace=replace, lazy=lazy, prefilter=prefilter is not None)
+
+        # The message and entity protos are reused for all the messages of the subscription
+        decode = MessageDecoder().decode
+
+        async def _callback(msg: Msg):
+            if self._loadable is None:
+                logger.error("Cannot load entity type in callback")
+                raise Exception(f"Cannot load {self.data_type}")
+            entity = decode(msg.data, lazy, prefilter)
+            if entity is not None:
+                await callback(entity)
+
+        return await self._subscribe_handler(_callback, replace, logger)
+
+    async def subscribe_batch(
+            self, callback: Callable[[Any], Awaitable[None]], max_batch: int = STREAM_BATCH_SIZE,
+            max_latency_ms: float = STREAM_BATCH_LATENCY_MS, replace: bool = False, columnar: bool = False,
+            prefilter: Callable[[Any], bool] | None = None,
+    ) -> SubscriptionUpdate | None:
+        """Subscribe to the topic and deliver the data to the given callback in batches, once per max_batch messages
+        or max_latency_ms after the first message of a batch, whichever comes first. Batches are lists of entities,
+        or {column: numpy array} mappings as returned by OtpClient.resolve_columns if columnar is True. The messages
+        still pending are delivered on unsubscribe and dropped on replace. replace and prefilter work as in
+        subscribe."""
+        logger = self.logger.bind(replace=replace, max_batch=max_batch, max_latency_ms=max_latency_ms,
+                                  columnar=columnar, prefilter=prefilter is not None)
+        if self._loadable is None:
+            logger.error("Cannot load entity type")
+            raise Exception(f"Cannot load {self.data_type}")
+        batcher = StreamBatcher(self._loadable, callback, max_batch, max_latency_ms, columnar, prefilter)
+
+        async def _callback(msg: Msg):
+            await batcher.add(msg.data)
+
+        return await self._subscribe_handler(_callback, replace, logger, batcher)
+
     async def is_subscribed(self) -> bool:
         """Returns True if the SubscriptionPotential is currently subscribed to the topic."""
         async with self._subscription_lock:
             return self.subscription is not None
 
     async def subscribe_queue(
-            self, q: asyncio.Queue, replace: bool = False
+            self, q: asyncio.Queue, replace: bool = False, lazy: bool = False,
+            prefilter: Callable[[Any], bool] | None = None,
     ) -> SubscriptionUpdate | None:
         """Subscribe to the topic and send data to the given queue. If replace is True, the current subscription will be
         replaced with the new one. If replace is False and there is already a subscription, an exception will be
-        raised."""
+        raised. If lazy is True, LazyEntity objects are sent to the queue. prefilter works as in subscribe."""
         logger = self.logger.bind(replace=replace)
 
         async def _callback(entity: Any):
@@ -120,7 +174,7 @@ class SubscriptionPotential:
 
         logger.info("Subscribing using queue handler")
 
-        sub = await self.subscribe(_callback, replace)
+        sub = await self.subscribe(_callback, replace, lazy, prefilter)
         async with self._access_queue_lock:
             if sub is not None:
                 self.queue = q
@@ -137,6 +191,9 @@ class SubscriptionPotential:
             if self.subscription is not None:
                 await self.subscription.unsubscribe()
                 self.subscription = None
+                if self._batcher is not None:
+                    await self._batcher.flush()
+                    self._batcher = None
                 async with self._access_queue_lock:
                     if self.queue is not None:
                         await self.queue.put(None)
@@ -158,20 +215,29 @@ EntityTypeVar = TypeVar("EntityTypeVar")
 
 
 class SubscriptionCollection:
-    """SubscriptionCollection is used to manage a collection of SubscriptionPotentials."""
+    """SubscriptionCollection is used to manage a collection of SubscriptionPotentials. If wildcard is True, the
+    SubscriptionPotentials of the collection subscribe through a WildcardDispatcher, with one NATS subscription per
+    source, asset class and data type instead of one per topic."""
     logger = log
 
     def __init__(
             self,
             nats_client: Client,
             sub_potentials: list[SubscriptionPotential] | None = None,
+            wildcard: bool = False,
     ):
-        self._sub_potentials: list[SubscriptionPotential] = []
+        self._nc = nats_client
+        self.dispatcher = WildcardDispatcher(nats_client) if wildcard else None
+
+        self._sub_potentials = TopicIndex()
         self._sub_potentials_lock = asyncio.Lock()
         if sub_potentials is not None:
-            self._sub_potentials = sub_potentials
+            for sub_potential in sub_potentials:
+                self._unsafe_add(sub_potential)
 
-        self._nc = nats_client
+    def _unsafe_add(self, sub_potential: SubscriptionPotential) -> None:
+        if self._sub_potentials.add(sub_potential) and self.dispatcher is not None:
+            sub_potential.dispatcher = self.dispatcher
 
     async def _subscribe(
             self,
@@ -210,21 +276,15 @@ class SubscriptionCollection:
                                            symbols: list[str] | None = None,
                                            active_only: bool = False,
                                            ) -> list[SubscriptionPotential]:
-        subs = self._sub_potentials
-        if source is not None and len(source) != 0:
-            subs = [sub for sub in subs if any(s.value in sub.topic for s in source)]
-
-        if asset_class is not None and len(asset_class) != 0:
-            subs = [sub for sub in subs if any(a.value in sub.topic for a in asset_class)]
-
-        if data_types is not None and len(data_types) != 0:
-            subs = [sub for sub in subs if any(d.value == sub.data_type for d in data_types)]
-
-        if symbols is not None and len(symbols) != 0:
-            subs = [sub for sub in subs if any(s in sub.topic for s in symbols)]
+        subs = self._sub_potentials.filter(
+            [s.value for s in source] if source is not None else None,
+            [a.value for a in asset_class] if asset_class is not None else None,
+            [d.value for d in data_types] if data_types is not None else None,
+            symbols,
+        )
 
         if active_only:
-            subs = [sub for sub in subs if sub.is_subscribed()]
+            subs = [sub for sub in subs if await sub.is_subscribed()]
 
         return subs
 
@@ -235,8 +295,9 @@ class SubscriptionCollection:
                                    symbols: list[str] | None = None,
                                    active_only: bool = False,
                                    ) -> list[SubscriptionPotential]:
-        """Filter the subscriptions based on the given criteria. If active_only is True, only active subscriptions
-        will be returned."""
+        """Filter the subscriptions based on the given criteria. Sources, asset classes and symbols are matched
+        exactly against the parts of the topics (e.g. "BTC" does not match "WBTC" or "BTC/USD"). If active_only is
+        True, only active subscriptions will be returned."""
         async with self._sub_potentials_lock:
             return await self._unsafe_filter_subscriptions(
                 source, asset_class, data_types, symbols, active_only)
@@ -265,6 +326,48 @@ class SubscriptionCollection:
             callback, None, source, asset_class, data_types, symbols
         )
 
+    async def subscribe_live_frame(self,
+                                   frame: LiveFrame,
+                                   source: list[SourceEnum] | None = None,
+                                   asset_class: list[AssetClassEnum] | None = None,
+                                   data_types: list[DatatypeEnum] | None = None,
+                                   symbols: list[str] | None = None,
+                                   ) -> list[SubscriptionPotential]:
+        """Subscribe to the topics that match the given criteria and append the data to the given LiveFrame. If
+        data_types is None, the data types of the entity type of the frame are used."""
+        if data_types is None:
+            data_types = [data_type for data_type, loadable in loadable_map.items() if loadable is frame.loadable]
+        return await self._subscribe(
+            frame, None, source, asset_class, data_types, symbols
+        )
+
+    async def subscribe_batch(self,
+                              callback: Callable[[Any], Awaitable[None]],
+                              max_batch: int = STREAM_BATCH_SIZE,
+                              max_latency_ms: float = STREAM_BATCH_LATENCY_MS,
+                              columnar: bool = False,
+                              source: list[SourceEnum] | None = None,
+                              asset_class: list[AssetClassEnum] | None = None,
+                              data_types: list[DatatypeEnum] | None = None,
+                              symbols: list[str] | None = None,
+                              ) -> list[SubscriptionPotential]:
+        """Subscribe to the topics that match the given criteria and deliver the data to the given callback in
+        batches, see SubscriptionPotential.subscribe_batch. Each topic is batched separately, so a batch only holds
+        entities of one topic."""
+        logger = self.logger.bind(
+            source=source, asset_class=asset_class, data_types=data_types, symbols=symbols)
+        async with self._sub_potentials_lock:
+            subs = await self._unsafe_filter_subscriptions(
+                source, asset_class, data_types, symbols
+            )
+
+            for sub_potential in subs:
+                await sub_potential.subscribe_batch(callback, max_batch, max_latency_ms, columnar=columnar)
+
+            logger.info("Subscribed to topics matching criteria in batches")
+
+            return subs
+
     async def update(self, updates: list[SubscriptionUpdate]):
         self.logger.info("Updating subscriptions")
         async with self._sub_potentials_lock:
@@ -280,21 +383,22 @@ class SubscriptionCollection:
     async def _unsafe_update_delete(self, update: SubscriptionUpdate) -> None:
         for _, topics in update.topics.items():
             for topic in topics:
-                for sub_potential in self._sub_potentials:
-                    if sub_potential.topic == topic:
-                        # print("Unsubscribing from", sub_potential._topic)
-                        await sub_potential.unsubscribe()
-                        if update.server_bound:
-                            self._sub_potentials.remove(sub_potential)
-                        break
+                sub_potential = self._sub_potentials.get(topic)
+                if sub_potential is not None:
+                    await sub_potential.unsubscribe()
+                    if update.server_bound:
+                        self._sub_potentials.remove(topic)
 
     async def _unsafe_update_add(self, update: SubscriptionUpdate) -> None:
         sps = await update.to_sub_potential(self._nc)
 
-        existing_topics = [sp.topic for sp in self._sub_potentials]
         for sp in sps:
-            if sp.topic not in existing_topics:
-                self._sub_potentials.append(sp)
+            self._unsafe_add(sp)
+
+    async def get_subscription(self, topic: str) -> SubscriptionPotential | None:
+        """Returns the SubscriptionPotential of the given topic, or None if the collection does not hold it."""
+        async with self._sub_potentials_lock:
+            return self._sub_potentials.get(topic)
 
     async def get_all_subscriptions(self) -> list[SubscriptionPotential]:
         """Returns all the SubscriptionPotentials."""
@@ -314,11 +418,10 @@ class SubscriptionCollection:
                     dtype_topics[k].update(v)
                     overall_topics.update(v)
 
-            sub_topics = {sub.topic for sub in self._sub_potentials}
             updates: list[SubscriptionUpdate] = []
             topics_to_remove: list[str] = []
             # Check topics to remove
-            for sub in self._sub_potentials:
+            for sub in self._sub_potentials.values():
                 if sub.topic not in overall_topics:
                     topics_to_remove.append(sub.topic)
             if len(topics_to_remove) > 0:
@@ -335,7 +438,7 @@ class SubscriptionCollection:
             # Check topics to add
             for dtype, topics in dtype_topics.items():
                 for topic in topics:
-                    if topic not in sub_topics:
+                    if topic not in self._sub_potentials:
                         updates.append(
                             SubscriptionUpdate(
                                 {dtype: [topic]}, StreamRequestOPEnum.ADD, server_bound=True
@@ -0,0 +1,110 @@
+from typing import Any, Iterable, NamedTuple
+
+from otpclient.client.enums import AssetClassEnum, SourceEnum
+
+_sources = {source.value for source in SourceEnum}
+_asset_classes = {asset_class.value for asset_class in AssetClassEnum}
+
+
+class TopicKey(NamedTuple):
+    """Structured key of a stream topic. source and asset_class are None if the topic does not name one."""
+    source: str | None
+    asset_class: str | None
+    data_type: str
+    symbol: str
+
+    @classmethod
+    def parse(cls, topic: str, data_type: str) -> "TopicKey":
+        """Parse a stream topic carrying data of the given data type. Source and asset class are the first tokens of
+        the topic equal to a SourceEnum and AssetClassEnum value. The symbol is the part of the topic after the data
+        type token (so that symbols containing dots are kept whole), or the last token if the data type is not part
+        of the topic."""
+        tokens = topic.split(".")
+        source = next((token for token in tokens if token in _sources), None)
+        asset_class = next((token for token in tokens if token in _asset_classes), None)
+        symbol = tokens[-1]
+        if data_type in tokens[:-1]:
+            symbol = ".".join(tokens[tokens.index(data_type) + 1:])
+        return cls(source, asset_class, data_type, symbol)
+
+
+class TopicIndex:
+    """TopicIndex holds subscription potentials by topic, in insertion order, and indexes their topics by source,
+    asset class, data type and symbol, so that lookups, filters and removals do not scan all the topics."""
+
+    def __init__(self) -> None:
+        self._subs: dict[str, Any] = {}
+        self._keys: dict[str, TopicKey] = {}
+        # Insertion sequence number of each topic, filter results are returned in insertion order
+        self._seq: dict[str, int] = {}
+        self._next_seq = 0
+        # One value -> topics mapping per TopicKey field
+        self._fields: tuple[dict[str | None, set[str]], ...] = tuple({} for _ in TopicKey._fields)
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    def __contains__(self, topic: str) -> bool:
+        return topic in self._subs
+
+    def get(self, topic: str) -> Any:
+        """Returns the subscription potential of the given topic, or None."""
+        return self._subs.get(topic)
+
+    def key(self, topic: str) -> TopicKey | None:
+        return self._keys.get(topic)
+
+    def values(self) -> list[Any]:
+        return list(self._subs.values())
+
+    def add(self, sub_potential: Any) -> bool:
+        """Add a subscription potential. Returns False, leaving the index unchanged, if its topic is already held."""
+        topic = sub_potential.topic
+        if topic in self._subs:
+            return False
+        key = TopicKey.parse(topic, sub_potential.data_type)
+        self._subs[topic] = sub_potential
+        self._keys[topic] = key
+        self._seq[topic] = self._next_seq
+        self._next_seq += 1
+        for index, value in zip(self._fields, key):
+            index.setdefault(value, set()).add(topic)
+        return True
+
+    def remove(self, topic: str) -> Any:
+        """Remove the given topic. Returns its subscription potential, or None if the topic is not held."""
+        sub_potential = self._subs.pop(topic, None)
+        if sub_potential is None:
+            return None
+        key = self._keys.pop(topic)
+        del self._seq[topic]
+        for index, value in zip(self._fields, key):
+            topics = index[value]
+            topics.discard(topic)
+            if len(topics) == 0:
+                del index[value]
+        return sub_potential
+
+    def filter(
+            self,
+            source: Iterable[str] | None = None,
+            asset_class: Iterable[str] | None = None,
+            data_types: Iterable[str] | None = None,
+            symbols: Iterable[str] | None = None,
+    ) -> list[Any]:
+        """Returns the subscription potentials whose topic matches one of the given values of every given field,
+        in insertion order. None or empty criteria match every topic. Values are matched exactly."""
+        matches: list[set[str]] = []
+        for index, values in zip(self._fields, (source, asset_class, data_types, symbols)):
+            if values is None:
+                continue
+            values = list(values)
+            if len(values) == 0:
+                continue
+            matches.append(set().union(*(index.get(value, ()) for value in values)))
+
+        if len(matches) == 0:
+            return list(self._subs.values())
+        matches.sort(key=len)
+        topics = matches[0].intersection(*matches[1:])
+        return [self._subs[topic] for topic in sorted(topics, key=self._seq.__getitem__)]
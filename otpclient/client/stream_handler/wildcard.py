@@ -0,0 +1,90 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from nats.aio.client import Client
+from nats.aio.client import Subscription
+from nats.aio.msg import Msg
+
+from otpclient.client.stream_handler.topic_index import TopicKey
+from otpclient.logging.logger import log
+
+
+def wildcard_subject(topic: str, data_type: str) -> str:
+    """Returns the NATS wildcard subject covering the given topic and the topics of the other symbols with the same
+    prefix (e.g. alpaca.stock.bar.AAPL -> alpaca.stock.bar.>), or the topic itself if it has no prefix."""
+    symbol = TopicKey.parse(topic, data_type).symbol
+    if len(symbol) >= len(topic):
+        return topic
+    return f"{topic[:len(topic) - len(symbol)]}>"
+
+
+class DispatchSubscription:
+    """Handle of a topic subscribed through a WildcardDispatcher, used by SubscriptionPotential in place of a NATS
+    Subscription."""
+
+    def __init__(self, dispatcher: "WildcardDispatcher", topic: str) -> None:
+        self._dispatcher = dispatcher
+        self.topic = topic
+
+    async def unsubscribe(self) -> None:
+        await self._dispatcher.unsubscribe(self.topic)
+
+
+class WildcardDispatcher:
+    """WildcardDispatcher subscribes to NATS once per wildcard subject (one per source, asset class and data type)
+    instead of once per topic, and routes each message to the handler of its topic through a topic -> handler
+    mapping. The wildcard subscription is removed with the last topic it covers. Messages of topics without a handler
+    are dropped and counted in unrouted. All the topics of a wildcard subject share one NATS subscription, so their
+    handlers run one after the other and share its pending limits."""
+    logger = log
+
+    def __init__(self, nats_client: Client) -> None:
+        self._nc = nats_client
+        self._handlers: dict[str, Callable[[Msg], Awaitable[None]]] = {}
+        # Wildcard subject of each topic with a handler, and the topics covered by each wildcard subscription
+        self._subjects: dict[str, str] = {}
+        self._subscriptions: dict[str, tuple[Subscription, set[str]]] = {}
+        self._lock = asyncio.Lock()
+        self.unrouted = 0
+
+    async def _dispatch(self, msg: Msg) -> None:
+        handler = self._handlers.get(msg.subject)
+        if handler is None:
+            self.unrouted += 1
+            return
+        await handler(msg)
+
+    async def subscribe(
+            self, topic: str, data_type: str, handler: Callable[[Msg], Awaitable[None]],
+    ) -> DispatchSubscription:
+        """Route the messages of the given topic to handler, subscribing to its wildcard subject if needed. The
+        handler of a topic that already has one is replaced."""
+        async with self._lock:
+            subject = wildcard_subject(topic, data_type)
+            if subject not in self._subscriptions:
+                subscription = await self._nc.subscribe(subject, cb=self._dispatch)
+                self._subscriptions[subject] = (subscription, set())
+                self.logger.info("Subscribed to wildcard subject", subject=subject)
+            self._subscriptions[subject][1].add(topic)
+            self._subjects[topic] = subject
+            self._handlers[topic] = handler
+            return DispatchSubscription(self, topic)
+
+    async def unsubscribe(self, topic: str) -> None:
+        """Stop routing the messages of the given topic, unsubscribing from its wildcard subject if it was the last
+        topic covered by it."""
+        async with self._lock:
+            subject = self._subjects.pop(topic, None)
+            if subject is None:
+                return
+            del self._handlers[topic]
+            subscription, topics = self._subscriptions[subject]
+            topics.discard(topic)
+            if len(topics) == 0:
+                del self._subscriptions[subject]
+                await subscription.unsubscribe()
+                self.logger.info("Unsubscribed from wildcard subject", subject=subject)
+
+    def subjects(self) -> list[str]:
+        """Returns the wildcard subjects currently subscribed to."""
+        return list(self._subscriptions)
@@ -1,16 +1,25 @@
+import nats
 from nats.aio.client import Client
 
 from otpclient.client.client import OtpClient
 from otpclient.client.dataprovider_client import DataproviderClient
 from otpclient.client.datastorage_client import DatastorageClient
+from otpclient.client.defaults import NATS_SERVER_URL
 from otpclient.client.sentimentanalyzer_client import SentimentAnalyzerClient
 
 
 class UserClient(OtpClient):
     """Wrapper client for all user-facing clients."""
 
-    def __init__(self, nats_client: Client):
+    def __init__(self, nats_client: Client, wildcard_subscriptions: bool = False):
         super().__init__(nats_client)
-        self.dataprovider = DataproviderClient(nats_client)
+        self.dataprovider = DataproviderClient(nats_client, wildcard_subscriptions)
         self.datastorage = DatastorageClient(nats_client)
         self.sentimentanalyzer = SentimentAnalyzerClient(nats_client)
+
+    @classmethod
+    async def new(cls, nats_url: str = NATS_SERVER_URL, wildcard_subscriptions: bool = False) -> "UserClient":
+        """Create a new client, connect to given URL and return the client object. wildcard_subscriptions is passed
+        to the DataproviderClient."""
+        nc = await nats.connect(nats_url)
+        return cls(nc, wildcard_subscriptions)
@@ -2,21 +2,53 @@ from typing import Any
 
 import pandas as pd
 
+from otpclient.proto.arrow import to_arrow, write_parquet
+from otpclient.proto.codec import column_extractor, entity_init, entity_setstate
+from otpclient.proto.columnar import columns_to_dataframe, entities_to_columns
+
 
 class Base:
+    """Base class of the flat entities. Subclasses declare their proto_type and their fields in columns and store
+    them in __slots__, so instances have no __dict__. The __init__ copying the fields from the proto, the
+    __setstate__ interning them again when unpickled and the columnar decoding loop are generated from columns when
+    the subclass is created."""
+    proto_type: Any = None
+    columns: dict[str, tuple[str, str]] = {}
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Subclasses reusing the columns of their parent (e.g. DailyBars) reuse its generated code
+        if "columns" in cls.__dict__:
+            cls.__init__ = entity_init(cls.proto_type, cls.columns)  # type: ignore
+            cls.__setstate__ = entity_setstate(cls.proto_type, cls.columns)  # type: ignore
+            cls.extract_columns = staticmethod(column_extractor(cls.proto_type, cls.columns))
+
     @classmethod
-    def list_to_dataframe(cls, entities: list["Any"]):
-        """Convert a list of entities to a DataFrame."""
-        data = [entity.__dict__ for entity in entities]
+    def load(cls, proto: bytes) -> Any:
+        entity = cls.proto_type()
+        entity.ParseFromString(proto)
+        return cls(entity)
 
-        # Create a DataFrame from the list of dictionaries
-        df = pd.DataFrame.from_records(data)
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the fields of the entity as a dict."""
+        return {name: getattr(self, name) for name in self.columns}
 
-        # Convert timestamp to datetime and set it as the index
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-        df.set_index('timestamp', inplace=True)
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()})"
 
-        # Drop the original "timestamp" column
-        df.drop(columns=['timestamp'], inplace=True, errors="ignore")
+    @classmethod
+    def list_to_dataframe(cls, entities: list["Any"]) -> pd.DataFrame:
+        """Convert a list of entities to a DataFrame indexed by timestamp, with the column dtypes declared in
+        columns."""
+        return columns_to_dataframe(cls, entities_to_columns(cls, entities))
 
-        return df
+    @classmethod
+    def list_to_arrow(cls, entities: list["Any"]) -> Any:
+        """Convert a list of entities to an Arrow table with a schema generated from the proto. Requires pyarrow."""
+        return to_arrow(cls, entities)
+
+    @classmethod
+    def write_parquet(cls, entities: list["Any"], path: str, **kwargs: Any) -> None:
+        """Write a list of entities to a Parquet file. Requires pyarrow."""
+        write_parquet(cls, entities, path, **kwargs)
@@ -0,0 +1,169 @@
+from typing import Any, AsyncIterator
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+
+from otpclient.client.defaults import PARQUET_BATCH_SIZE
+from otpclient.proto.codec import attribute_name
+from otpclient.proto.columnar import fields_to_columns
+from otpclient.proto.postprocess import entity_type
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Epoch seconds fields that are exported as Arrow timestamps
+TIMESTAMP_FIELDS = {"timestamp", "created_at", "updated_at"}
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow and Parquet export, install otpclient[arrow]")
+
+
+def category_fields(loadable: Any) -> set[str]:
+    """Returns the names of the fields of the given entity class that are exported dictionary encoded."""
+    columns = getattr(loadable, "columns", {})
+    dtypes = {name: dtype for name, (_, dtype) in columns.items()} if columns else getattr(loadable, "table_columns", {})
+    return {name for name, dtype in dtypes.items() if dtype == "category"}
+
+
+def _scalar_type(field: FieldDescriptor) -> Any:
+    if field.type == FieldDescriptor.TYPE_DOUBLE:
+        return pa.float64()
+    if field.type == FieldDescriptor.TYPE_FLOAT:
+        return pa.float32()
+    if field.type in (FieldDescriptor.TYPE_INT64, FieldDescriptor.TYPE_SINT64, FieldDescriptor.TYPE_SFIXED64):
+        return pa.int64()
+    if field.type in (FieldDescriptor.TYPE_UINT64, FieldDescriptor.TYPE_FIXED64):
+        return pa.uint64()
+    if field.type in (FieldDescriptor.TYPE_INT32, FieldDescriptor.TYPE_SINT32, FieldDescriptor.TYPE_SFIXED32,
+                      FieldDescriptor.TYPE_ENUM):
+        return pa.int32()
+    if field.type in (FieldDescriptor.TYPE_UINT32, FieldDescriptor.TYPE_FIXED32):
+        return pa.uint32()
+    if field.type == FieldDescriptor.TYPE_BOOL:
+        return pa.bool_()
+    if field.type == FieldDescriptor.TYPE_STRING:
+        return pa.string()
+    if field.type == FieldDescriptor.TYPE_BYTES:
+        return pa.binary()
+    raise ValueError(f"Unsupported proto field type {field.type} of {field.full_name}")
+
+
+def _fields(descriptor: Descriptor, categories: set[str], parents: tuple[str, ...]) -> list[Any]:
+    fields = []
+    for field in descriptor.fields:
+        name = attribute_name(field)
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            # Recursive messages (the News of a sentiment nested in a News) are cut
+            if field.message_type.full_name in parents:
+                continue
+            arrow_type = pa.struct(_fields(field.message_type, set(), parents + (field.message_type.full_name,)))
+        elif name in TIMESTAMP_FIELDS and field.type == FieldDescriptor.TYPE_INT64:
+            arrow_type = pa.timestamp("s")
+        elif name in categories and field.type == FieldDescriptor.TYPE_STRING:
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        else:
+            arrow_type = _scalar_type(field)
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            arrow_type = pa.list_(arrow_type)
+        fields.append(pa.field(name, arrow_type))
+    return fields
+
+
+_schemas: dict[Any, Any] = {}
+
+
+def arrow_schema(loadable: Any) -> "pa.Schema":
+    """Returns the Arrow schema of entities of the given entity class, generated from the DESCRIPTOR of its proto.
+    Columns are named after the entity attributes."""
+    require_pyarrow()
+    schema = _schemas.get(loadable)
+    if schema is None:
+        descriptor = loadable.proto_type.DESCRIPTOR
+        schema = pa.schema(_fields(descriptor, category_fields(loadable), (descriptor.full_name,)))
+        _schemas[loadable] = schema
+    return schema
+
+
+def _to_python(value: Any, arrow_type: Any) -> Any:
+    """Convert an entity field value holding nested entities to the dicts and lists of the given Arrow type."""
+    if pa.types.is_list(arrow_type):
+        return [_to_python(item, arrow_type.value_type) for item in value]
+    if pa.types.is_struct(arrow_type):
+        if value is None:
+            return None
+        return {arrow_type.field(i).name: _to_python(getattr(value, arrow_type.field(i).name),
+                                                     arrow_type.field(i).type) for i in range(arrow_type.num_fields)}
+    return value
+
+
+def _column(field: Any, values: Any) -> Any:
+    arrow_type = field.type
+    if pa.types.is_dictionary(arrow_type):
+        return pa.array(values, type=pa.string()).dictionary_encode()
+    if pa.types.is_timestamp(arrow_type):
+        return pa.array(values, type=pa.int64()).cast(arrow_type)
+    if pa.types.is_struct(arrow_type) or (pa.types.is_list(arrow_type) and pa.types.is_struct(arrow_type.value_type)):
+        return pa.array([_to_python(value, arrow_type) for value in values], type=arrow_type)
+    return pa.array(values, type=arrow_type)
+
+
+def to_arrow(loadable: Any, entities: list[Any]) -> "pa.Table":
+    """Convert entities of the given entity class to an Arrow table with the schema returned by arrow_schema."""
+    schema = arrow_schema(loadable)
+    flat = {name: "object" for name in schema.names}
+    for field in schema:
+        if pa.types.is_integer(field.type) or pa.types.is_timestamp(field.type):
+            flat[field.name] = "int64"
+        elif pa.types.is_floating(field.type):
+            flat[field.name] = "float64"
+        elif pa.types.is_boolean(field.type):
+            flat[field.name] = "bool"
+    columns = fields_to_columns(entities, flat)
+    return pa.Table.from_arrays([_column(field, columns[field.name]) for field in schema], schema=schema)
+
+
+def write_parquet(loadable: Any, entities: list[Any], path: str, **kwargs: Any) -> None:
+    """Write entities of the given entity class to a Parquet file. kwargs are passed to pyarrow.parquet.write_table
+    (e.g. compression)."""
+    require_pyarrow()
+    pq.write_table(to_arrow(loadable, entities), path, **kwargs)
+
+
+def _write_batch(writer: Any, path: str, batch: list[Any], kwargs: dict[str, Any]) -> Any:
+    """Write a batch of entities with the given ParquetWriter, opening one with the schema of the entities first if
+    writer is None. Returns the writer."""
+    loadable = entity_type(batch[0])
+    if writer is None:
+        writer = pq.ParquetWriter(path, arrow_schema(loadable), **kwargs)
+    writer.write_table(to_arrow(loadable, batch))
+    return writer
+
+
+async def write_parquet_iter(entities: AsyncIterator[Any], path: str, batch_size: int = PARQUET_BATCH_SIZE,
+                             **kwargs: Any) -> int:
+    """Write the entities of an async iterator (e.g. OtpClient.iter_data) to a Parquet file, one row group per
+    batch_size entities, so that only one batch is held in memory. kwargs are passed to pyarrow.parquet.ParquetWriter.
+    Returns the number of rows written, no file is created if the iterator is empty."""
+    require_pyarrow()
+    writer = None
+    batch: list[Any] = []
+    rows = 0
+    try:
+        async for entity in entities:
+            batch.append(entity)
+            if len(batch) >= batch_size:
+                writer = _write_batch(writer, path, batch, kwargs)
+                rows += len(batch)
+                batch = []
+        if len(batch) > 0:
+            writer = _write_batch(writer, path, batch, kwargs)
+            rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
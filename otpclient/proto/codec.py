@@ -0,0 +1,125 @@
+import re
+from typing import Any, Callable
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+
+from otpclient.proto.intern import symbol_table
+
+# Proto field type -> dtype of the column holding the field
+FIELD_DTYPES: dict[int, str] = {
+    FieldDescriptor.TYPE_DOUBLE: "float64",
+    FieldDescriptor.TYPE_FLOAT: "float64",
+    FieldDescriptor.TYPE_INT64: "int64",
+    FieldDescriptor.TYPE_SINT64: "int64",
+    FieldDescriptor.TYPE_SFIXED64: "int64",
+    FieldDescriptor.TYPE_UINT64: "int64",
+    FieldDescriptor.TYPE_FIXED64: "int64",
+    FieldDescriptor.TYPE_INT32: "int64",
+    FieldDescriptor.TYPE_SINT32: "int64",
+    FieldDescriptor.TYPE_SFIXED32: "int64",
+    FieldDescriptor.TYPE_UINT32: "int64",
+    FieldDescriptor.TYPE_FIXED32: "int64",
+    FieldDescriptor.TYPE_ENUM: "int64",
+    FieldDescriptor.TYPE_BOOL: "bool",
+    FieldDescriptor.TYPE_STRING: "object",
+    FieldDescriptor.TYPE_BYTES: "object",
+}
+
+
+def attribute_name(field: FieldDescriptor) -> str:
+    """Returns the name of the entity attribute holding the given proto field (e.g. BidExchange -> bid_exchange)."""
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", field.name).lower()
+
+
+def descriptor_columns(descriptor: Descriptor, categories: tuple[str, ...] = ()) -> dict[str, tuple[str, str]]:
+    """Returns the columns of a flat entity generated from the DESCRIPTOR of its proto: attribute name -> (proto
+    field, dtype). Repeated fields are object columns, the fields named in categories are categorical."""
+    columns = {}
+    for field in descriptor.fields:
+        if field.type not in FIELD_DTYPES:
+            raise ValueError(f"Field {field.full_name} cannot be decoded into a column")
+        name = attribute_name(field)
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            dtype = "object"
+        elif name in categories:
+            dtype = "category"
+        else:
+            dtype = FIELD_DTYPES[field.type]
+        columns[name] = (field.name, dtype)
+
+    unknown = set(categories) - set(columns)
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown categorical fields {sorted(unknown)} of {descriptor.full_name}")
+    return columns
+
+
+def _intern_function(proto_type: Any, field: str, dtype: str) -> str | None:
+    """Returns the name of the symbol table function interning the values of the given field, None if they are not
+    interned. Categorical and repeated fields are interned."""
+    if proto_type.DESCRIPTOR.fields_by_name[field].label == FieldDescriptor.LABEL_REPEATED:
+        return "intern_tuple"
+    if dtype == "category":
+        return "intern"
+    return None
+
+
+def _value(proto_type: Any, field: str, dtype: str, expression: str) -> str:
+    """Returns the expression interning the given value expression of field if the field is interned."""
+    intern = _intern_function(proto_type, field, dtype)
+    return expression if intern is None else f"{intern}({expression})"
+
+
+def _compile(name: str, lines: list[str]) -> Callable:
+    namespace = {"intern": symbol_table.intern, "intern_tuple": symbol_table.intern_tuple}
+    exec("\n".join(lines), namespace)
+    return namespace[name]
+
+
+def entity_init(proto_type: Any, columns: dict[str, tuple[str, str]]) -> Callable[[Any, Any], None]:
+    """Generate the __init__ of a flat entity, copying each field of the proto into its attribute with a plain
+    attribute read instead of a getattr call."""
+    lines = ["def __init__(self, proto):"]
+    lines += [f"    self.{name} = {_value(proto_type, field, dtype, f'proto.{field}')}"
+              for name, (field, dtype) in columns.items()]
+    return _compile("__init__", lines)
+
+
+def entity_setstate(proto_type: Any, columns: dict[str, tuple[str, str]]) -> Callable[[Any, Any], None]:
+    """Generate the __setstate__ of a flat entity, restoring its attributes from the pickled state and interning
+    them as __init__ does. Entities decoded in a DecodePool worker process are interned in the worker's own symbol
+    table, unpickling them in the parent makes them share the values of the parent's table."""
+    lines = ["def __setstate__(self, state):",
+             "    slots = state[1]"]
+    lines += [f"    self.{name} = {_value(proto_type, field, dtype, f'slots[{name!r}]')}"
+              for name, (field, dtype) in columns.items()]
+    return _compile("__setstate__", lines)
+
+
+def intern_columns(proto_type: Any, columns: dict[str, tuple[str, str]], arrays: dict[str, Any]) -> None:
+    """Intern the values of the categorical and repeated columns in place, e.g. after the columns were decoded in a
+    DecodePool worker process, which interns them in its own symbol table."""
+    for name, (field, dtype) in columns.items():
+        intern = _intern_function(proto_type, field, dtype)
+        if intern is None:
+            continue
+        intern = getattr(symbol_table, intern)
+        column = arrays[name]
+        for i, value in enumerate(column):
+            column[i] = intern(value)
+
+
+def column_extractor(proto_type: Any, columns: dict[str, tuple[str, str]]) -> Callable[..., int]:
+    """Generate the loop decoding serialized protos into preallocated column arrays. The generated function takes a
+    reusable proto instance, an iterable of payloads and the columns by name, and returns the number of payloads
+    decoded."""
+    names = list(columns)
+    lines = ["def extract_columns(proto, payloads, columns):"]
+    lines += [f"    c{i} = columns[{name!r}]" for i, name in enumerate(names)]
+    lines += ["    i = 0",
+              "    for payload in payloads:",
+              "        proto.ParseFromString(payload)"]
+    lines += [f"        c{i}[i] = {_value(proto_type, columns[name][0], columns[name][1], f'proto.{columns[name][0]}')}"
+              for i, name in enumerate(names)]
+    lines += ["        i += 1",
+              "    return i"]
+    return _compile("extract_columns", lines)
@@ -0,0 +1,86 @@
+from operator import attrgetter
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def supports_columns(loadable: Any) -> bool:
+    """Returns True if the given entity class declares a column layout and can be decoded columnar."""
+    return len(getattr(loadable, "columns", {})) > 0
+
+
+def storage_dtype(dtype: str) -> str:
+    """Returns the dtype of the array a column of the given dtype is decoded into. Categorical columns are decoded
+    as objects and datetime columns as epoch seconds, they are converted when the DataFrame is built."""
+    if dtype == "category":
+        return "object"
+    if dtype == "datetime":
+        return "int64"
+    return dtype
+
+
+def to_datetime(seconds: np.ndarray) -> np.ndarray:
+    """Convert epoch seconds to nanosecond datetimes."""
+    return seconds.astype("datetime64[s]").astype("datetime64[ns]")
+
+
+def to_columns(loadable: Any, payloads: Iterable[bytes], count: int) -> dict[str, np.ndarray]:
+    """Decode count serialized entity protos of the given entity class straight into preallocated column arrays,
+    without building an entity object or a dict per row."""
+    if not supports_columns(loadable):
+        raise ValueError(f"{loadable.__name__} does not support columnar decoding")
+
+    columns = {name: np.empty(count, dtype=storage_dtype(dtype)) for name, (_, dtype) in loadable.columns.items()}
+    # A single proto instance is reused, ParseFromString clears it before parsing
+    i = loadable.extract_columns(loadable.proto_type(), payloads, columns)
+
+    if i != count:
+        raise ValueError(f"Expected {count} payloads, got {i}")
+    return columns
+
+
+def fields_to_columns(entities: list[Any], dtypes: dict[str, str]) -> dict[str, np.ndarray]:
+    """Collect the given fields of entities into preallocated column arrays, one per field name -> dtype."""
+    count = len(entities)
+    columns = {}
+    for name, dtype in dtypes.items():
+        dtype = storage_dtype(dtype)
+        values = map(attrgetter(name), entities)
+        if dtype == "object":
+            column = np.empty(count, dtype=object)
+            column[:] = list(values)
+        else:
+            column = np.fromiter(values, dtype=dtype, count=count)
+        columns[name] = column
+    return columns
+
+
+def entities_to_columns(loadable: Any, entities: list[Any]) -> dict[str, np.ndarray]:
+    """Collect the fields of entities of the given entity class into preallocated column arrays."""
+    if not supports_columns(loadable):
+        raise ValueError(f"{loadable.__name__} does not support columnar decoding")
+    return fields_to_columns(entities, {name: dtype for name, (_, dtype) in loadable.columns.items()})
+
+
+def typed_dataframe(columns: dict[str, np.ndarray], dtypes: dict[str, str], index: str) -> pd.DataFrame:
+    """Convert columns to a DataFrame with the given field name -> dtype, indexed by the given datetime field."""
+    data = {}
+    for name, dtype in dtypes.items():
+        if name == index:
+            continue
+        column = columns[name] if name in columns else np.empty(0, dtype=storage_dtype(dtype))
+        if dtype == "category":
+            column = pd.Categorical(column)
+        elif dtype == "datetime":
+            column = to_datetime(column)
+        data[name] = column
+
+    timestamps = columns.get(index, np.empty(0, dtype=np.int64))
+    return pd.DataFrame(data, index=pd.DatetimeIndex(to_datetime(timestamps), name=index))
+
+
+def columns_to_dataframe(loadable: Any, columns: dict[str, np.ndarray]) -> pd.DataFrame:
+    """Convert decoded columns of the given entity class to a DataFrame indexed by timestamp, with the dtypes
+    declared by the entity class."""
+    return typed_dataframe(columns, {name: dtype for name, (_, dtype) in loadable.columns.items()}, "timestamp")
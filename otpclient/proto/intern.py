@@ -0,0 +1,54 @@
+from typing import Any, Iterable
+
+from otpclient.client.defaults import INTERN_MAX_SIZE
+
+
+class SymbolTable:
+    """SymbolTable interns the values of entity fields that repeat across entities (symbols, exchanges, sources...),
+    so that all entities share one object per distinct value. The table is bounded, once it holds max_size values new
+    values are returned as they are instead of being added."""
+
+    def __init__(self, max_size: int = INTERN_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._values: dict[Any, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def intern(self, value: str) -> str:
+        """Returns the shared object equal to value, adding value to the table if it is not full."""
+        shared = self._values.get(value)
+        if shared is not None:
+            self.hits += 1
+            return shared
+        self.misses += 1
+        if len(self._values) < self.max_size:
+            self._values[value] = value
+        return value
+
+    def intern_tuple(self, values: Iterable[str]) -> tuple[str, ...]:
+        """Returns the shared tuple of the interned values, used for repeated fields like trade conditions."""
+        return self.intern(tuple(map(self.intern, values)))
+
+    @property
+    def hit_rate(self) -> float:
+        """Returns the fraction of interned values that were already in the table."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {"size": len(self._values), "max_size": self.max_size, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hit_rate}
+
+    def clear(self) -> None:
+        """Drop all values and reset the stats."""
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Table shared by the decoders of all entity types. Each decode worker process has its own, entities and columns
+# decoded in a worker are interned again in this table when they reach the parent process
+symbol_table = SymbolTable()
@@ -0,0 +1,67 @@
+from typing import Any
+
+from otpclient.proto.columnar import supports_columns
+from otpclient.proto.intern import symbol_table
+
+
+def proto_fields(loadable: Any) -> dict[str, str]:
+    """Returns the entity field -> proto field mapping of the fields that can be read straight from the proto of the
+    given entity class. Repeated fields are only read from the proto for columnar entities, which hold them as
+    interned tuples."""
+    if supports_columns(loadable):
+        return {name: field for name, (field, _) in loadable.columns.items()}
+    return getattr(loadable, "proto_fields", {})
+
+
+class LazyEntity:
+    """LazyEntity stands in for an entity of the given class without decoding it. The payload is parsed the first
+    time a field is read, and fields are then read from the proto when accessed. Reading a field that is not a plain
+    proto field (e.g. News.sentiments), or calling an entity method, builds the full entity once and delegates to
+    it."""
+    __slots__ = ("entity_type", "_payload", "_proto", "_entity")
+
+    def __init__(self, entity_type: Any, payload: bytes) -> None:
+        self.entity_type = entity_type
+        self._payload: bytes | None = payload
+        self._proto: Any = None
+        self._entity: Any = None
+
+    def _get_proto(self) -> Any:
+        if self._proto is None:
+            proto = self.entity_type.proto_type()
+            proto.ParseFromString(self._payload)
+            self._proto = proto
+            self._payload = None
+        return self._proto
+
+    def materialize(self) -> Any:
+        """Returns the full entity, building it on first call."""
+        if self._entity is None:
+            self._entity = self.entity_type(self._get_proto())
+        return self._entity
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that are not slots, dunder lookups (e.g. by pickle) must not build the entity
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if self._entity is not None:
+            return getattr(self._entity, name)
+        field = proto_fields(self.entity_type).get(name)
+        if field is None:
+            return getattr(self.materialize(), name)
+        value = getattr(self._get_proto(), field)
+        # Repeated fields are copied as the entity holds them, so the proto is not kept alive by the caller
+        return value if isinstance(value, (str, int, float, bool, bytes)) else symbol_table.intern_tuple(value)
+
+    def __reduce__(self) -> tuple:
+        # Pickled as the serialized payload, generated protos cannot be pickled
+        payload = self._payload if self._payload is not None else self._proto.SerializeToString()
+        return LazyEntity, (self.entity_type, payload)
+
+    def __repr__(self) -> str:
+        return f"LazyEntity({self.entity_type.__name__})"
+
+
+def materialize(entity: Any) -> Any:
+    """Returns the full entity of a lazy entity, or the entity itself."""
+    return entity.materialize() if isinstance(entity, LazyEntity) else entity
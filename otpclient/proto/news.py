@@ -2,23 +2,52 @@ from typing import Any
 
 import pandas as pd
 
+from otpclient.proto.arrow import to_arrow, write_parquet
+from otpclient.proto.columnar import fields_to_columns, typed_dataframe
+from otpclient.proto.intern import symbol_table
+from otpclient.proto.lazy import materialize
 from otpclient.proto.news_pb2 import News as NewsProto
 from otpclient.proto.news_pb2 import NewsSentiment as NewsSentimentProto
 
 
 class NewsSentiment:
-    def __init__(self, news_proto: NewsSentimentProto) -> None:
+    # Column name -> dtype of the sentiments table built by News.list_to_dataframes
+    table_columns: dict[str, str] = {
+        "news_id": "int64",
+        "news_fingerprint": "object",
+        "timestamp": "datetime",
+        "sentiment": "category",
+        "sentiment_analysis_process": "category",
+        "fingerprint": "object",
+        "llm": "category",
+        "symbol": "category",
+        "system_prompt": "category",
+        "failed": "bool",
+        "raw_sentiment": "object",
+    }
+
+    def __init__(self, news_proto: NewsSentimentProto, news_id: int = 0, news_fingerprint: str = "") -> None:
+        """Sentiments nested in a News carry no news of their own, the id and fingerprint of that news are given
+        instead."""
         self.timestamp: int = news_proto.Timestamp
-        self.news: News = news_proto.News
-        self.sentiment: str = news_proto.Sentiment
-        self.sentiment_analysis_process: str = news_proto.SentimentAnalysisProcess
+        self.news: News | None = News(news_proto.News) if news_proto.HasField("News") else None
+        self.news_id: int = self.news.id if self.news is not None else news_id
+        self.news_fingerprint: str = self.news.fingerprint if self.news is not None else news_fingerprint
+        self.sentiment: str = symbol_table.intern(news_proto.Sentiment)
+        self.sentiment_analysis_process: str = symbol_table.intern(news_proto.SentimentAnalysisProcess)
         self.fingerprint: str = news_proto.Fingerprint
-        self.llm: str = news_proto.LLM
-        self.symbol: str = news_proto.Symbol
-        self.system_prompt: str = news_proto.SystemPrompt
+        self.llm: str = symbol_table.intern(news_proto.LLM)
+        self.symbol: str = symbol_table.intern(news_proto.Symbol)
+        self.system_prompt: str = symbol_table.intern(news_proto.SystemPrompt)
         self.failed: bool = news_proto.Failed
         self.raw_sentiment: str = news_proto.RawSentiment
 
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        # Entities decoded in a DecodePool worker are unpickled in this process, intern them in its table
+        self.__dict__.update(state)
+        for name in ("sentiment", "sentiment_analysis_process", "llm", "symbol", "system_prompt"):
+            setattr(self, name, symbol_table.intern(state[name]))
+
     @classmethod
     def load(cls, proto: bytes) -> Any:
         entity = NewsSentimentProto()
@@ -26,8 +55,8 @@ class NewsSentiment:
         return NewsSentiment(entity)
 
     @classmethod
-    def list_to_dataframe(cls, entities: list["LULD"]):
-        data = [entity.__dict__ for entity in entities]
+    def list_to_dataframe(cls, entities: list["NewsSentiment"]):
+        data = [materialize(entity).__dict__ for entity in entities]
         if len(data) == 0:
             return pd.DataFrame()
         # Create a DataFrame from the list of dictionaries
@@ -45,6 +74,36 @@ class NewsSentiment:
 
 
 class News:
+    proto_type = NewsProto
+    timestamp_field = "created_at"
+    # Column name -> dtype of the news table built by list_to_dataframes
+    table_columns: dict[str, str] = {
+        "id": "int64",
+        "author": "object",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+        "headline": "object",
+        "summary": "object",
+        "content": "object",
+        "url": "object",
+        "symbols": "object",
+        "fingerprint": "object",
+        "source": "category",
+    }
+    # Entity field -> proto field of the fields that lazy entities read straight from the proto
+    proto_fields: dict[str, str] = {
+        "id": "id",
+        "author": "Author",
+        "created_at": "CreatedAt",
+        "updated_at": "UpdatedAt",
+        "headline": "Headline",
+        "summary": "Summary",
+        "content": "Content",
+        "url": "URL",
+        "fingerprint": "Fingerprint",
+        "source": "Source",
+    }
+
     def __init__(self, news_proto: NewsProto) -> None:
         self.id: int = news_proto.id
         self.author: str = news_proto.Author
@@ -54,10 +113,17 @@ class News:
         self.summary: str = news_proto.Summary
         self.content: str = news_proto.Content
         self.url: str = news_proto.URL
-        self.symbols: list[str] = news_proto.Symbols
+        self.symbols: list[str] = list(map(symbol_table.intern, news_proto.Symbols))
         self.fingerprint: str = news_proto.Fingerprint
-        self.source: str = news_proto.Source
-        self.sentiments: list[NewsSentiment] = [NewsSentiment(sentiment) for sentiment in news_proto.Sentiments]
+        self.source: str = symbol_table.intern(news_proto.Source)
+        self.sentiments: list[NewsSentiment] = [NewsSentiment(sentiment, self.id, self.fingerprint)
+                                                for sentiment in news_proto.Sentiments]
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        # Entities decoded in a DecodePool worker are unpickled in this process, intern them in its table
+        self.__dict__.update(state)
+        self.symbols = list(map(symbol_table.intern, self.symbols))
+        self.source = symbol_table.intern(self.source)
 
     @classmethod
     def load(cls, proto: bytes) -> Any:
@@ -65,9 +131,21 @@ class News:
         entity.ParseFromString(proto)
         return News(entity)
 
+    @classmethod
+    def list_to_arrow(cls, entities: list["News"]) -> Any:
+        """Convert a list of news entities to an Arrow table with a schema generated from the proto, nested
+        entries become lists of structs. Requires pyarrow."""
+        return to_arrow(cls, entities)
+
+    @classmethod
+    def write_parquet(cls, entities: list["News"], path: str, **kwargs: Any) -> None:
+        """Write a list of news entities to a Parquet file. Requires pyarrow."""
+        write_parquet(cls, entities, path, **kwargs)
+
     @classmethod
     def list_to_dataframe(cls, entities: list["News"]):
-        data = [entity.__dict__ for entity in entities]
+        # Copied, so the entities keep their sentiment lists
+        data = [dict(materialize(entity).__dict__) for entity in entities]
 
         for d in data:
             d["sentiments"] = NewsSentiment.list_to_dataframe(d["sentiments"])
@@ -81,3 +159,14 @@ class News:
         df.drop(columns=['created_at'], inplace=True, errors="ignore")
 
         return df
+
+    @classmethod
+    def list_to_dataframes(cls, entities: list["News"]) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Convert news to two flat tables: the news indexed by created_at, and the sentiments of all news indexed by
+        timestamp. Sentiments reference their news through the news_id and news_fingerprint columns, the tables can be
+        joined on them (e.g. sentiments.merge(news, left_on="news_id", right_on="id"))."""
+        sentiments = [sentiment for entity in entities for sentiment in entity.sentiments]
+        news_df = typed_dataframe(fields_to_columns(entities, cls.table_columns), cls.table_columns, "created_at")
+        sentiments_df = typed_dataframe(fields_to_columns(sentiments, NewsSentiment.table_columns),
+                                        NewsSentiment.table_columns, "timestamp")
+        return news_df, sentiments_df
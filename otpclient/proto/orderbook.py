@@ -1,7 +1,11 @@
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from otpclient.proto.arrow import to_arrow, write_parquet
+from otpclient.proto.intern import symbol_table
+from otpclient.proto.lazy import materialize
 from otpclient.proto.orderbook_pb2 import Orderbook as OrderbookProto
 from otpclient.proto.orderbook_pb2 import OrderbookEntry as OrderbookEntryProto
 
@@ -10,7 +14,12 @@ class OrderbookEntry:
     def __init__(self, orderbook_entry_proto: OrderbookEntryProto) -> None:
         self.price: float = orderbook_entry_proto.Price
         self.size: float = orderbook_entry_proto.Size
-        self.source: str = orderbook_entry_proto.Source
+        self.source: str = symbol_table.intern(orderbook_entry_proto.Source)
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        # Entities decoded in a DecodePool worker are unpickled in this process, intern them in its table
+        self.__dict__.update(state)
+        self.source = symbol_table.intern(self.source)
 
     @classmethod
     def load(cls, proto: bytes) -> Any:
@@ -30,16 +39,34 @@ class OrderbookEntry:
 
 
 class Orderbook:
+    proto_type = OrderbookProto
+    # Entity field -> proto field of the fields that lazy entities read straight from the proto
+    proto_fields: dict[str, str] = {
+        "symbol": "Symbol",
+        "exchange": "Exchange",
+        "timestamp": "Timestamp",
+        "reset": "Reset",
+        "fingerprint": "Fingerprint",
+        "source": "Source",
+        "asset_class": "AssetClass",
+    }
+
     def __init__(self, orderbook_proto: OrderbookProto) -> None:
-        self.symbol: str = orderbook_proto.Symbol
-        self.exchange: str = orderbook_proto.Exchange
+        self.symbol: str = symbol_table.intern(orderbook_proto.Symbol)
+        self.exchange: str = symbol_table.intern(orderbook_proto.Exchange)
         self.timestamp: int = orderbook_proto.Timestamp
         self.asks: list[OrderbookEntry] = [OrderbookEntry(entry) for entry in orderbook_proto.Asks]
         self.bids: list[OrderbookEntry] = [OrderbookEntry(entry) for entry in orderbook_proto.Bids]
         self.reset: bool = orderbook_proto.Reset
         self.fingerprint: str = orderbook_proto.Fingerprint
-        self.source: str = orderbook_proto.Source
-        self.asset_class: str = orderbook_proto.AssetClass
+        self.source: str = symbol_table.intern(orderbook_proto.Source)
+        self.asset_class: str = symbol_table.intern(orderbook_proto.AssetClass)
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        # Entities decoded in a DecodePool worker are unpickled in this process, intern them in its table
+        self.__dict__.update(state)
+        for name in ("symbol", "exchange", "source", "asset_class"):
+            setattr(self, name, symbol_table.intern(state[name]))
 
     @classmethod
     def load(cls, proto: bytes) -> Any:
@@ -47,9 +74,21 @@ class Orderbook:
         entity.ParseFromString(proto)
         return Orderbook(entity)
 
+    @classmethod
+    def list_to_arrow(cls, entities: list["Orderbook"]) -> Any:
+        """Convert a list of orderbook entities to an Arrow table with a schema generated from the proto, nested
+        entries become lists of structs. Requires pyarrow."""
+        return to_arrow(cls, entities)
+
+    @classmethod
+    def write_parquet(cls, entities: list["Orderbook"], path: str, **kwargs: Any) -> None:
+        """Write a list of orderbook entities to a Parquet file. Requires pyarrow."""
+        write_parquet(cls, entities, path, **kwargs)
+
     @classmethod
     def list_to_dataframe(cls, entities: list["Orderbook"]):
-        data = [entity.__dict__ for entity in entities]
+        # Copied, so the entities keep their entry lists
+        data = [dict(materialize(entity).__dict__) for entity in entities]
 
         for d in data:
             d["asks"] = OrderbookEntry.list_to_dataframe(d["asks"])
@@ -66,3 +105,61 @@ class Orderbook:
         df.drop(columns=['timestamp'], inplace=True, errors="ignore")
 
         return df
+
+    @classmethod
+    def _levels(cls, entities: list["Orderbook"], side: str) -> dict[str, np.ndarray]:
+        """Returns the entries of the given side of all books as flat arrays, with the index of the book and the
+        level (position in the book side) of every entry."""
+        counts = np.fromiter((len(getattr(entity, side)) for entity in entities), dtype=np.int64, count=len(entities))
+        total = int(counts.sum())
+        entries = [entry for entity in entities for entry in getattr(entity, side)]
+        book = np.repeat(np.arange(len(entities)), counts)
+        # Position of every entry within its book: its flat index minus the flat index of the first entry of the book
+        starts = np.cumsum(counts) - counts
+        return {
+            "book": book,
+            "level": np.arange(total) - starts[book],
+            "price": np.fromiter((entry.price for entry in entries), dtype=np.float64, count=total),
+            "size": np.fromiter((entry.size for entry in entries), dtype=np.float64, count=total),
+        }
+
+    @classmethod
+    def list_to_long_dataframe(cls, entities: list["Orderbook"]) -> pd.DataFrame:
+        """Convert order books to a flat DataFrame indexed by timestamp, with one row per book entry and the columns
+        symbol, side ("ask" or "bid"), level (position in the book side), price and size. Rows keep the order of the
+        books, asks before bids."""
+        asks = cls._levels(entities, "asks")
+        bids = cls._levels(entities, "bids")
+        book = np.concatenate([asks["book"], bids["book"]])
+        # The stable sort groups the entries by book, keeping asks before bids and the level order
+        order = np.argsort(book, kind="stable")
+        book = book[order]
+
+        timestamps = np.fromiter((entity.timestamp for entity in entities), dtype=np.int64, count=len(entities))
+        symbols = np.empty(len(entities), dtype=object)
+        symbols[:] = [entity.symbol for entity in entities]
+        sides = np.concatenate([np.zeros(len(asks["book"]), dtype=np.int8), np.ones(len(bids["book"]), dtype=np.int8)])
+
+        index = pd.DatetimeIndex(timestamps[book].astype("datetime64[s]").astype("datetime64[ns]"), name="timestamp")
+        return pd.DataFrame({
+            "symbol": pd.Categorical(symbols[book]),
+            "side": pd.Categorical.from_codes(sides[order], categories=["ask", "bid"]),
+            "level": np.concatenate([asks["level"], bids["level"]])[order],
+            "price": np.concatenate([asks["price"], bids["price"]])[order],
+            "size": np.concatenate([asks["size"], bids["size"]])[order],
+        }, index=index)
+
+    @classmethod
+    def list_to_level_matrix(cls, entities: list["Orderbook"], levels: int) -> tuple[np.ndarray, np.ndarray]:
+        """Convert order books to their top levels. Returns the timestamps of the books and a float matrix of shape
+        (books, 2, levels, 2), indexed by book, side (0 asks, 1 bids), level and value (0 price, 1 size). Levels a
+        book does not have are NaN."""
+        matrix = np.full((len(entities), 2, levels, 2), np.nan)
+        for side, name in enumerate(("asks", "bids")):
+            entries = cls._levels(entities, name)
+            top = entries["level"] < levels
+            book, level = entries["book"][top], entries["level"][top]
+            matrix[book, side, level, 0] = entries["price"][top]
+            matrix[book, side, level, 1] = entries["size"][top]
+        timestamps = np.fromiter((entity.timestamp for entity in entities), dtype=np.int64, count=len(entities))
+        return timestamps, matrix
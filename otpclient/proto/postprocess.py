@@ -0,0 +1,56 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from otpclient.proto.lazy import LazyEntity
+
+
+def timestamp_field(loadable: Any) -> str:
+    """Returns the name of the field entities of the given class are ordered by (created_at for news)."""
+    return getattr(loadable, "timestamp_field", "timestamp")
+
+
+def entity_type(entity: Any) -> Any:
+    """Returns the entity class of the entity, also for lazy entities."""
+    if isinstance(entity, LazyEntity):
+        return entity.entity_type
+    return type(entity)
+
+
+def entity_timestamp(entity: Any) -> int:
+    """Returns the timestamp the entity is ordered by."""
+    return getattr(entity, timestamp_field(entity_type(entity)))
+
+
+def sort_dedup_order(timestamps: np.ndarray, fingerprints: np.ndarray) -> np.ndarray:
+    """Returns the indices that sort the rows by timestamp and keep only the first row of each fingerprint. The sort
+    is stable, so rows with equal timestamps keep their order."""
+    n = len(timestamps)
+    order = np.argsort(timestamps, kind="stable")
+    if n < 2:
+        return order
+    # Codes are assigned to the fingerprints by equality, the first row of each code in timestamp order is kept
+    codes, _ = pd.factorize(fingerprints[order])
+    _, first = np.unique(codes, return_index=True)
+    first.sort()
+    return order[first]
+
+
+def sort_dedup_entities(entities: list[Any]) -> list[Any]:
+    """Sort entities by timestamp and drop entities with an already seen fingerprint."""
+    if len(entities) == 0:
+        return entities
+    field = timestamp_field(entity_type(entities[0]))
+    timestamps = np.fromiter((getattr(entity, field) for entity in entities), dtype=np.int64, count=len(entities))
+    fingerprints = np.empty(len(entities), dtype=object)
+    fingerprints[:] = [entity.fingerprint for entity in entities]
+    return [entities[i] for i in sort_dedup_order(timestamps, fingerprints)]
+
+
+def sort_dedup_columns(columns: dict[str, np.ndarray], field: str = "timestamp") -> dict[str, np.ndarray]:
+    """Sort decoded columns by the given timestamp field and drop rows with an already seen fingerprint."""
+    if len(columns) == 0:
+        return columns
+    order = sort_dedup_order(columns[field], columns["fingerprint"])
+    return {name: column[order] for name, column in columns.items()}
@@ -1,3 +1,5 @@
+from typing import Iterable, Iterator
+
 import otpclient.proto.transmission_message_pb2 as transmission_message_pb2
 
 
@@ -12,3 +14,12 @@ class TransmissionMessage:
         message = transmission_message_pb2.Message()  # type: ignore
         message.ParseFromString(proto)
         return TransmissionMessage(message)
+
+    @classmethod
+    def iter_payloads(cls, protos: Iterable[bytes]) -> Iterator[tuple[str, bytes]]:
+        """Yield (data_type, payload) for each serialized message without building a TransmissionMessage per
+        message."""
+        message = transmission_message_pb2.Message()  # type: ignore
+        for proto in protos:
+            message.ParseFromString(proto)
+            yield message.DataType, message.Payload